@@ -10,28 +10,225 @@ import cv2
 import numpy as np
 import time
 import os
+import logging
 import queue
+import struct
 import threading
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing import shared_memory
 from aiortc import VideoStreamTrack
 from av import VideoFrame
 
+from utils import generate_timestamp, get_writable_directory, get_available_video_devices, PI_CAMERA_DEVICE_NAMES, RateLimitFilter, RATE_LIMITED
+
+# Repeats of the per-frame errors marked RATE_LIMITED are dropped for a second,
+# so a camera failing on every frame doesn't flood the log
+log = logging.getLogger("camera_manager")
+log.addFilter(RateLimitFilter(interval=1.0))
+
 # Try to import Pi-specific camera libraries
 try:
-    from picamera2 import Picamera2
+    from picamera2 import Picamera2, MappedArray
     CAMERA_AVAILABLE = True
 except ImportError:
     CAMERA_AVAILABLE = False
-    print("[Camera] PiCamera2 not available. Video stream may use a placeholder.")
+    log.warning("[Camera] PiCamera2 not available. Video stream may use a placeholder.")
+
+# Picamera2's encoders turn the low-resolution stream into JPEG previews
+try:
+    from picamera2.encoders import MJPEGEncoder
+    from picamera2.outputs import Output
+    JPEG_ENCODER_AVAILABLE = True
+except ImportError:
+    JPEG_ENCODER_AVAILABLE = False
+
+# libcamera ships with Picamera2 and lets the ISP do the 180 degree flip
+try:
+    from libcamera import Transform
+    TRANSFORM_AVAILABLE = True
+except ImportError:
+    TRANSFORM_AVAILABLE = False
+
+# Optional JIT compiler for the text overlay blitter
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    log.warning("[Camera] Numba not available. Text overlays will use cv2.putText.")
 
 # Import thermal camera
 from thermal_camera import ThermalCamera
-from utils import generate_timestamp, get_writable_directory
 
-class GlobalCameraStreamTrack(VideoStreamTrack):
+# Shared black frame at the thermal stream size (3x scale of 192x256)
+_ZERO_FRAME = np.zeros((576, 768, 3), dtype=np.uint8)
+_ZERO_FRAME.setflags(write=False)
+
+# Frames for fixed messages, rendered once and keyed by all the drawing arguments
+_RENDERED_CACHE = {}
+
+def _render_static_frame(message, position, scale, color, thickness):
+    """Return a read-only black frame with a fixed message, rendering it only once."""
+    key = (message, tuple(position), scale, tuple(color), thickness)
+    frame = _RENDERED_CACHE.get(key)
+    if frame is None:
+        frame = _ZERO_FRAME.copy()
+        cv2.putText(
+            frame, message, position,
+            cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness
+        )
+        frame.setflags(write=False)
+        _RENDERED_CACHE[key] = frame
+    return frame
+
+# Glyph masks for printable ASCII, keyed by (scale, thickness)
+_GLYPH_ATLASES = {}
+
+def _build_glyph_atlas(scale, thickness):
+    """Render printable ASCII once with cv2.putText into fixed-size glyph masks."""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (_, ascent), descent = cv2.getTextSize("Ag", font, scale, thickness)
+    cell_height = ascent + descent + thickness
+    cell_width = max(cv2.getTextSize(chr(c), font, scale, thickness)[0][0] for c in range(32, 127)) + thickness
+    
+    glyphs = np.zeros((128, cell_height, cell_width), dtype=np.uint8)
+    advances = np.zeros(128, dtype=np.int32)
+    for code in range(32, 127):
+        cv2.putText(glyphs[code], chr(code), (0, ascent), font, scale, 255, thickness)
+        advances[code] = cv2.getTextSize(chr(code), font, scale, thickness)[0][0]
+    return glyphs, advances, ascent
+
+def _blit_glyphs(buf, x, y, codes, glyphs, advances, color):
+    """Paint glyph masks into a BGR buffer with the first glyph's top-left corner at (x, y)."""
+    cell_height = glyphs.shape[1]
+    cell_width = glyphs.shape[2]
+    for code in codes:
+        for gy in range(cell_height):
+            py = y + gy
+            if py < 0 or py >= buf.shape[0]:
+                continue
+            for gx in range(cell_width):
+                px = x + gx
+                if px < 0 or px >= buf.shape[1]:
+                    continue
+                if glyphs[code, gy, gx]:
+                    buf[py, px, 0] = color[0]
+                    buf[py, px, 1] = color[1]
+                    buf[py, px, 2] = color[2]
+        x += advances[code]
+
+if NUMBA_AVAILABLE:
+    _blit_glyphs = njit(cache=True)(_blit_glyphs)
+
+def _draw_text(frame, text, origin, scale, color, thickness):
+    """Draw text like cv2.putText, using the compiled glyph blitter when Numba is available."""
+    if not NUMBA_AVAILABLE:
+        cv2.putText(frame, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+        return
+        
+    atlas = _GLYPH_ATLASES.get((scale, thickness))
+    if atlas is None:
+        atlas = _GLYPH_ATLASES[(scale, thickness)] = _build_glyph_atlas(scale, thickness)
+    glyphs, advances, ascent = atlas
+    
+    codes = np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8)
+    _blit_glyphs(
+        frame, origin[0], origin[1] - ascent, codes,
+        glyphs, advances, np.array(color, dtype=np.uint8)
+    )
+
+# Masks for the stale-data label: the fixed prefix, the digits and the unit,
+# all drawn at scale 1 with thickness 2
+_STALE_SPRITES = {}
+
+def _text_sprite(text):
+    """Render text once into a boolean mask, returning (mask, advance, ascent)."""
+    sprite = _STALE_SPRITES.get(text)
+    if sprite is None:
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        scale, thickness = 1, 2
+        (width, ascent), descent = cv2.getTextSize(text, font, scale, thickness)
+        mask = np.zeros((ascent + descent + thickness, width + thickness), dtype=np.uint8)
+        cv2.putText(mask, text, (0, ascent), font, scale, 255, thickness)
+        sprite = _STALE_SPRITES[text] = (mask.astype(bool)[..., None], width, ascent)
+    return sprite
+
+def _draw_stale_label(frame, seconds, origin, color=(0, 0, 255)):
+    """Draw 'STALE DATA - <seconds>s' by pasting pre-rendered sprites."""
+    color = np.array(color, dtype=np.uint8)
+    x, y = origin
+    for text in ("STALE DATA - ", *str(seconds), "s"):
+        mask, advance, ascent = _text_sprite(text)
+        top = y - ascent
+        region = frame[top:top + mask.shape[0], x:x + mask.shape[1]]
+        if region.shape[:2] == mask.shape[:2]:
+            np.copyto(region, color, where=mask)
+        x += advance
+
+class ReusableFrameTrack(VideoStreamTrack):
+    """Video stream track that hands the encoder one reused yuv420p VideoFrame."""
+    # Bound at import so the per-frame conversion skips the cv2/np module lookups
+    _cvt_color = staticmethod(cv2.cvtColor)
+    _copyto = staticmethod(np.copyto)
+    _BGR2I420 = cv2.COLOR_BGR2YUV_I420
+    
+    def __init__(self):
+        super().__init__()
+        self._video_frame = None
+        self._plane_views = None  # ndarray views over the VideoFrame's Y, U and V planes
+        self._yuv_planes = None  # Y, U and V views into the I420 conversion buffer
+        self._yuv = None
+        self._last_src = (None, None)  # (source array, key) currently held in the VideoFrame
+        
+    def _to_video_frame(self, frame, flip=False, key=None):
+        """
+        Convert a BGR ndarray into the reused yuv420p VideoFrame.
+        
+        The encoder wants yuv420p, so converting here with OpenCV avoids a
+        second, slower conversion in libswscale. With flip the image is
+        rotated 180 degrees while copying into the planes. Passing the same
+        (unmodified) array again, as happens with stale and cached frames,
+        reuses the previous conversion. Sources that reuse their buffers pass a
+        key (e.g. a frame sequence number) that changes with the contents.
+        """
+        last_frame, last_key = self._last_src
+        if frame is last_frame and key == last_key:
+            return self._video_frame
+            
+        height, width = frame.shape[:2]
+        video_frame = self._video_frame
+        if video_frame is None or video_frame.width != width or video_frame.height != height:
+            video_frame = VideoFrame(width=width, height=height, format="yuv420p")
+            plane_sizes = ((height, width), (height // 2, width // 2), (height // 2, width // 2))
+            # Planes may be padded, so honour each plane's line size
+            self._plane_views = [
+                np.ndarray(size, dtype=np.uint8, buffer=plane, strides=(plane.line_size, 1))
+                for plane, size in zip(video_frame.planes, plane_sizes)
+            ]
+            # I420 is the full Y plane followed by the quarter-size U and V planes
+            self._yuv = np.empty((height * 3 // 2, width), dtype=np.uint8)
+            flat = self._yuv.reshape(-1)
+            y_size = height * width
+            self._yuv_planes = (
+                self._yuv[:height],
+                flat[y_size:y_size + y_size // 4].reshape(plane_sizes[1]),
+                flat[y_size + y_size // 4:].reshape(plane_sizes[2]),
+            )
+            self._video_frame = video_frame
+            
+        self._cvt_color(frame, self._BGR2I420, dst=self._yuv)
+        copyto = self._copyto
+        for dst, src in zip(self._plane_views, self._yuv_planes):
+            copyto(dst, src[::-1, ::-1] if flip else src)
+        self._last_src = (frame, key)
+        return video_frame
+
+class GlobalCameraStreamTrack(ReusableFrameTrack):
     """Video stream track for the regular camera."""
-    def __init__(self, camera):
+    def __init__(self, camera_manager):
         super().__init__()
-        self.camera = camera
+        self.camera_manager = camera_manager
         self.data_channel = None
         self.kind = "video"
         self.track_id = "regular"
@@ -41,19 +238,23 @@ class GlobalCameraStreamTrack(VideoStreamTrack):
         self.data_channel = channel
 
     async def recv(self):
-        # Capture frame
-        frame = self.camera.capture_array()
-        # Flip if you need
-        frame = cv2.flip(frame, -1)
-        
-        # Create video frame from numpy array
-        video_frame = VideoFrame.from_ndarray(frame, format="bgr24")
+        # Convert the latest frame straight from the capture buffer; if the ISP
+        # couldn't flip it, the flip is done while copying into the VideoFrame
+        with self.camera_manager.latest_frame() as (frame, seq):
+            if frame is None:
+                frame = _render_static_frame(
+                    "Waiting for camera...", (50, 288), 1, (0, 200, 200), 2
+                )
+                flip = False
+            else:
+                flip = self.camera_manager.software_flip
+            video_frame = self._to_video_frame(frame, flip=flip, key=seq)
         pts, time_base = await self.next_timestamp()
         video_frame.pts = pts
         video_frame.time_base = time_base
         return video_frame
 
-class ThermalCameraStreamTrack(VideoStreamTrack):
+class ThermalCameraStreamTrack(ReusableFrameTrack):
     """Video stream track for the thermal camera."""
     def __init__(self, thermal_camera):
         super().__init__()
@@ -66,76 +267,97 @@ class ThermalCameraStreamTrack(VideoStreamTrack):
         self.last_frame_time = 0
         self.error_count = 0
         self.failure_count = 0  # Count of consecutive complete failures
+        self._cached_error_frames = {}  # key -> (base frame, message, rendered frame)
         
-        # Create a default placeholder frame
-        self.default_frame = np.zeros((576, 768, 3), dtype=np.uint8)
-        cv2.putText(
-            self.default_frame,
-            "Initializing thermal camera...",
-            (50, 288),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (0, 200, 200),
-            2
+        # Default placeholder frame
+        self.default_frame = _render_static_frame(
+            "Initializing thermal camera...", (50, 288), 1, (0, 200, 200), 2
         )
         
+        # Tiny black frame sent while no peer is listening on the data channel
+        self._idle_frame = VideoFrame(width=16, height=16, format="yuv420p")
+        for plane, value in zip(self._idle_frame.planes, (0, 128, 128)):
+            plane.update(bytes([value]) * plane.buffer_size)
+        
     def set_data_channel(self, channel):
         """Set the data channel."""
         self.data_channel = channel
         
+    def _get_cached(self, key, base, message, position, scale, color, thickness, stale_ok=False):
+        """
+        Return base with message drawn on it, rendering only when base or message change.
+        
+        With stale_ok the cached frame is reused even if the message text differs,
+        which keeps counters from forcing a re-render on every frame.
+        """
+        cached = self._cached_error_frames.get(key)
+        if cached is not None and cached[0] is base and (stale_ok or cached[1] == message):
+            return cached[2]
+            
+        frame = base.copy()
+        _draw_text(frame, message, position, scale, color, thickness)
+        self._cached_error_frames[key] = (base, message, frame)
+        return frame
+        
     def create_error_frame(self, message="No thermal data available"):
         """Create an error frame with the given message."""
-        frame = np.zeros((576, 768, 3), dtype=np.uint8)  # 3x scale of 192x256
-        # Add message
-        cv2.putText(
-            frame, message, (50, 288),
-            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2
-        )
-        # Add timestamp
+        # The frame only changes once per second (timestamp resolution)
         timestamp = time.strftime("%H:%M:%S")
-        cv2.putText(
-            frame, f"Time: {timestamp}", (50, 320),
-            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1
-        )
+        cached = self._cached_error_frames.get("error")
+        if cached is not None and cached[1] == (message, timestamp):
+            return cached[2]
+            
+        # The message part is rendered once; only the timestamp is redrawn
+        base = self._cached_error_frames.get("error_base")
+        if base is None or base[1] != message:
+            base_frame = _ZERO_FRAME.copy()
+            cv2.putText(
+                base_frame, message, (50, 288),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2
+            )
+            base = (None, message, base_frame)
+            self._cached_error_frames["error_base"] = base
+            
+        frame = base[2].copy()
+        # Add timestamp
+        _draw_text(frame, f"Time: {timestamp}", (50, 320), 0.6, (200, 200, 200), 1)
+        self._cached_error_frames["error"] = (None, (message, timestamp), frame)
         return frame
         
     async def recv(self):
+        # No peer attached yet: only keep the timestamps moving
+        if self.data_channel is None or not self.data_channel.is_ready:
+            pts, time_base = await self.next_timestamp()
+            self._idle_frame.pts = pts
+            self._idle_frame.time_base = time_base
+            return self._idle_frame
+            
         current_time = time.time()
         
         try:
             # Check if thermal camera is actually available
-            if not self.thermal_camera or not hasattr(self.thermal_camera, 'cap') or not self.thermal_camera.cap.isOpened():
+            if not self.thermal_camera or not getattr(self.thermal_camera, 'available', False):
                 self.failure_count += 1
                 if self.failure_count < 5 or self.failure_count % 30 == 0:  # Log less frequently after initial failures
-                    print(f"[Camera] Thermal camera not available ({self.failure_count} failures)")
+                    log.warning("[Camera] Thermal camera not available (%s failures)", self.failure_count)
                 
                 if self.last_frame is not None:
                     # Use the last valid frame with a warning
-                    frame = self.last_frame.copy()
-                    cv2.putText(
-                        frame, 
-                        "CAMERA DISCONNECTED", 
-                        (50, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 
-                        1, 
-                        (0, 0, 255), 
-                        2
+                    frame = self._get_cached(
+                        "disconnected", self.last_frame, "CAMERA DISCONNECTED",
+                        (50, 50), 1, (0, 0, 255), 2
                     )
                 else:
-                    # Use the default frame
-                    frame = self.default_frame.copy()
-                    cv2.putText(
-                        frame, 
-                        f"CAMERA UNAVAILABLE ({self.failure_count})", 
-                        (50, 330),
-                        cv2.FONT_HERSHEY_SIMPLEX, 
-                        0.7, 
-                        (0, 0, 255), 
-                        1
+                    # Use the default frame, refreshing the counter every 30 frames
+                    frame = self._get_cached(
+                        "unavailable", self.default_frame,
+                        f"CAMERA UNAVAILABLE ({self.failure_count})",
+                        (50, 330), 0.7, (0, 0, 255), 1,
+                        stale_ok=self.failure_count % 30 != 0
                     )
                     
                 # Create video frame and return early
-                video_frame = VideoFrame.from_ndarray(frame, format="bgr24")
+                video_frame = self._to_video_frame(frame)
                 pts, time_base = await self.next_timestamp()
                 video_frame.pts = pts
                 video_frame.time_base = time_base
@@ -160,73 +382,80 @@ class ThermalCameraStreamTrack(VideoStreamTrack):
                     self.failure_count = 0  # Reset complete failure count
                 elif self.last_frame is not None and current_time - self.last_frame_time < 30:
                     # Use the last valid frame if we couldn't get a new one and it's not too old
-                    frame = self.last_frame.copy()  # Always copy to avoid modifying cached frame
+                    frame = self.last_frame
                     self.error_count += 1
                     
                     # If we've had several errors in a row, add a warning label
                     if self.error_count > 5:
-                        cv2.putText(
-                            frame, 
-                            f"STALE DATA - {self.error_count}s", 
-                            (50, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 
-                            1, 
-                            (0, 0, 255), 
-                            2
-                        )
+                        # Refresh the counter every 30 frames or when the base frame changes
+                        cached = self._cached_error_frames.get("stale")
+                        if cached is None or cached[0] is not self.last_frame or self.error_count % 30 == 0:
+                            frame = self.last_frame.copy()
+                            _draw_stale_label(frame, self.error_count, (50, 50))
+                            self._cached_error_frames["stale"] = (self.last_frame, self.error_count, frame)
+                        else:
+                            frame = cached[2]
                 else:
                     # No recent frames available
                     frame = self.create_error_frame("No thermal frames available")
             except Exception as frame_err:
-                print(f"[Camera] Error getting thermal frame: {frame_err}")
+                log.error("[Camera] Error getting thermal frame: %s", frame_err, extra=RATE_LIMITED)
                 if self.last_frame is not None:
-                    frame = self.last_frame.copy()
-                    cv2.putText(
-                        frame, 
-                        "FRAME ERROR", 
-                        (50, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 
-                        1, 
-                        (0, 0, 255), 
-                        2
+                    frame = self._get_cached(
+                        "frame_error", self.last_frame, "FRAME ERROR",
+                        (50, 50), 1, (0, 0, 255), 2
                     )
                 else:
                     frame = self.create_error_frame(f"Error: {str(frame_err)}")
                 
         except Exception as e:
-            print(f"[Camera] Critical error in thermal camera track: {e}")
+            log.error("[Camera] Critical error in thermal camera track: %s", e, extra=RATE_LIMITED)
             # Fall back to our default frame for any critical errors
             if self.default_frame is not None:
-                frame = self.default_frame.copy()
-                cv2.putText(
-                    frame, 
-                    f"ERROR: {str(e)}", 
-                    (50, 330),
-                    cv2.FONT_HERSHEY_SIMPLEX, 
-                    0.6, 
-                    (0, 0, 255), 
-                    1
+                frame = self._get_cached(
+                    "critical", self.default_frame, f"ERROR: {str(e)}",
+                    (50, 330), 0.6, (0, 0, 255), 1
                 )
             else:
                 # If all else fails, create a basic error frame
-                frame = np.zeros((576, 768, 3), dtype=np.uint8)
-                cv2.putText(
-                    frame, 
-                    "Critical error in thermal camera", 
-                    (50, 288),
-                    cv2.FONT_HERSHEY_SIMPLEX, 
-                    1, 
-                    (0, 0, 255), 
-                    2
+                frame = _render_static_frame(
+                    "Critical error in thermal camera", (50, 288), 1, (0, 0, 255), 2
                 )
         
         # Create video frame from numpy array
-        video_frame = VideoFrame.from_ndarray(frame, format="bgr24")
+        video_frame = self._to_video_frame(frame)
         pts, time_base = await self.next_timestamp()
         video_frame.pts = pts
         video_frame.time_base = time_base
         return video_frame
 
+def _opencv_has_gstreamer():
+    """Check whether this OpenCV build includes the GStreamer backend"""
+    try:
+        for line in cv2.getBuildInformation().splitlines():
+            if line.strip().startswith("GStreamer:"):
+                return "YES" in line
+    except Exception:
+        pass
+    return False
+
+GSTREAMER_AVAILABLE = _opencv_has_gstreamer()
+
+# Fixed .npy header size, so the header can be rewritten in place as frames are appended
+NPY_HEADER_SIZE = 128
+
+# How often a writer thread waiting for frames checks whether recording stopped, in seconds
+WRITER_POLL_INTERVAL = 0.5
+
+def _npy_header(dtype, shape):
+    """Build a .npy v1.0 header padded to NPY_HEADER_SIZE bytes"""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(np.dtype(dtype)), tuple(shape)
+    )
+    prefix = np.lib.format.magic(1, 0)
+    header_len = NPY_HEADER_SIZE - len(prefix) - 2
+    return prefix + struct.pack('<H', header_len) + header.ljust(header_len - 1).encode('latin1') + b'\n'
+
 class VideoRecorder:
     """Handles recording video from camera sources"""
     
@@ -235,6 +464,7 @@ class VideoRecorder:
         self.recording = False
         self.stop_flag = threading.Event()
         self.recording_threads = []
+        self._writer_threads = {}  # Writer threads by stream, they release their VideoWriter
         self.normal_video_writer = None
         self.thermal_video_writer = None
         self.recording_dir = None
@@ -247,6 +477,39 @@ class VideoRecorder:
             "thermal": 0,
             "thermal_data": 0
         }
+        self.frames_dropped = {
+            "normal": 0,
+            "thermal": 0,
+            "thermal_data": 0
+        }
+        self.thermal_data_path = None
+        self._npy_queue = None  # Thermal data frames waiting to be written to disk
+        self._normal_queue = None  # Frames waiting for the normal video writer
+        self._thermal_queue = None  # Frames waiting for the thermal video writer
+        
+    def _open_video_writer(self, path, fps, size):
+        """
+        Open a VideoWriter for an .mp4 file.
+        
+        Uses the Pi's hardware H.264 encoder (v4l2h264enc) through GStreamer
+        when available, otherwise the software mp4v encoder.
+        """
+        if GSTREAMER_AVAILABLE:
+            pipeline = (
+                "appsrc ! videoconvert ! video/x-raw,format=I420 ! "
+                'v4l2h264enc extra-controls="controls,video_bitrate=4000000" ! '
+                "video/x-h264,level=(string)4 ! h264parse ! mp4mux ! "
+                f"filesink location={path}"
+            )
+            writer = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, fps, size, True)
+            if writer.isOpened():
+                log.info("[VideoRecorder] Using hardware H.264 encoder for %s", path)
+                return writer
+            writer.release()
+            log.warning("[VideoRecorder] Hardware H.264 encoder not available, using mp4v")
+            
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        return cv2.VideoWriter(path, fourcc, fps, size)
         
     def start_recording(self, thermal_data_fps=1):
         """
@@ -256,7 +519,7 @@ class VideoRecorder:
             thermal_data_fps: Frames per second for thermal data (.npy) recording
         """
         if self.recording:
-            print("[VideoRecorder] Already recording")
+            log.warning("[VideoRecorder] Already recording")
             return {"error": "Already recording"}
             
         try:
@@ -264,22 +527,30 @@ class VideoRecorder:
             self.timestamp = generate_timestamp()
             self.thermal_data_fps = max(0.1, min(30, thermal_data_fps))  # Limit FPS between 0.1 and 30
             self.frames_recorded = {"normal": 0, "thermal": 0, "thermal_data": 0}
+            self.frames_dropped = {"normal": 0, "thermal": 0, "thermal_data": 0}
+            self._normal_queue = None
+            self._thermal_queue = None
+            self._npy_queue = None
             
             # Get a writable directory
             base_dir = get_writable_directory()
             if not base_dir:
                 return {"error": "No writable directory found for recording"}
                 
-            # Create recording directory structure
+            # Work out every output path for this session once
             self.recording_dir = os.path.join(base_dir, f"video_{self.timestamp}")
-            os.makedirs(self.recording_dir, exist_ok=True)
-            
-            # Create thermal data directory
             self.thermal_data_dir = os.path.join(self.recording_dir, "thermal_data")
+            normal_video_path = os.path.join(self.recording_dir, f"normal_{self.timestamp}.mp4")
+            thermal_video_path = os.path.join(self.recording_dir, f"thermal_{self.timestamp}.mp4")
+            # All thermal data frames are appended to one (frames, H, W) .npy file
+            self.thermal_data_path = os.path.join(self.thermal_data_dir, f"temp_data_{self.timestamp}.npy")
+            
+            # Create the recording directory and its thermal data directory in one call
             os.makedirs(self.thermal_data_dir, exist_ok=True)
             
-            # Reset the stop flag
-            self.stop_flag.clear()
+            # A fresh stop flag, so a writer thread left over from a previous
+            # recording still sees its own as set
+            self.stop_flag = threading.Event()
             
             # Create video writers for both cameras
             if self.camera_manager.is_camera_available():
@@ -287,22 +558,24 @@ class VideoRecorder:
                 test_frame = self.camera_manager.capture_normal_frame()
                 if test_frame is not None:
                     h, w = test_frame.shape[:2]
-                    normal_video_path = os.path.join(self.recording_dir, f"normal_{self.timestamp}.mp4")
-                    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                    self.normal_video_writer = cv2.VideoWriter(normal_video_path, fourcc, self.video_fps, (w, h))
+                    self.normal_video_writer = self._open_video_writer(normal_video_path, self.video_fps, (w, h))
                     
-                    # Start normal camera recording thread
-                    normal_thread = threading.Thread(
-                        target=self._record_normal_video,
+                    # Start the normal camera's writer thread, so encoding
+                    # doesn't stall the capture cadence
+                    self._normal_queue = queue.Queue(maxsize=4)
+                    normal_writer_thread = threading.Thread(
+                        target=self._video_writer_loop,
+                        args=("normal", self._normal_queue, self.normal_video_writer, self.stop_flag),
                         daemon=True
                     )
-                    normal_thread.start()
-                    self.recording_threads.append(normal_thread)
-                    print(f"[VideoRecorder] Started normal camera recording to {normal_video_path} at {self.video_fps} FPS")
+                    normal_writer_thread.start()
+                    self.recording_threads.append(normal_writer_thread)
+                    self._writer_threads["normal"] = normal_writer_thread
+                    log.info("[VideoRecorder] Started normal camera recording to %s at %s FPS", normal_video_path, self.video_fps)
                 else:
-                    print("[VideoRecorder] Could not get test frame from normal camera")
+                    log.warning("[VideoRecorder] Could not get test frame from normal camera")
             else:
-                print("[VideoRecorder] Normal camera not available for recording")
+                log.warning("[VideoRecorder] Normal camera not available for recording")
                 
             # Set up thermal camera recording
             if self.camera_manager.is_thermal_available():
@@ -313,19 +586,22 @@ class VideoRecorder:
                     if test_frame_data and isinstance(test_frame_data, tuple) and len(test_frame_data) == 2:
                         test_frame, _ = test_frame_data
                         h, w = test_frame.shape[:2]
-                        thermal_video_path = os.path.join(self.recording_dir, f"thermal_{self.timestamp}.mp4")
-                        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                        self.thermal_video_writer = cv2.VideoWriter(thermal_video_path, fourcc, self.video_fps, (w, h))
+                        self.thermal_video_writer = self._open_video_writer(thermal_video_path, self.video_fps, (w, h))
                         
-                        # Start thermal camera recording thread
-                        thermal_thread = threading.Thread(
-                            target=self._record_thermal_video,
+                        # Start the thermal camera's writer thread
+                        self._thermal_queue = queue.Queue(maxsize=4)
+                        thermal_writer_thread = threading.Thread(
+                            target=self._video_writer_loop,
+                            args=("thermal", self._thermal_queue, self.thermal_video_writer, self.stop_flag),
                             daemon=True
                         )
-                        thermal_thread.start()
-                        self.recording_threads.append(thermal_thread)
+                        thermal_writer_thread.start()
+                        self.recording_threads.append(thermal_writer_thread)
+                        self._writer_threads["thermal"] = thermal_writer_thread
                         
-                        # Start thermal data recording thread
+                        # Start thermal data recording thread, with a writer thread
+                        # so disk latency doesn't stall the capture cadence
+                        self._npy_queue = queue.Queue(maxsize=16)
                         thermal_data_thread = threading.Thread(
                             target=self._record_thermal_data,
                             daemon=True
@@ -333,14 +609,33 @@ class VideoRecorder:
                         thermal_data_thread.start()
                         self.recording_threads.append(thermal_data_thread)
                         
-                        print(f"[VideoRecorder] Started thermal camera recording to {thermal_video_path} at {self.video_fps} FPS")
-                        print(f"[VideoRecorder] Thermal data will be saved to {self.thermal_data_dir} at {self.thermal_data_fps} FPS")
+                        npy_writer_thread = threading.Thread(
+                            target=self._npy_writer_loop,
+                            args=(self._npy_queue, self.thermal_data_path, self.stop_flag),
+                            daemon=True
+                        )
+                        npy_writer_thread.start()
+                        self.recording_threads.append(npy_writer_thread)
+                        
+                        log.info("[VideoRecorder] Started thermal camera recording to %s at %s FPS", thermal_video_path, self.video_fps)
+                        log.info("[VideoRecorder] Thermal data will be saved to %s at %s FPS", self.thermal_data_dir, self.thermal_data_fps)
                     else:
-                        print("[VideoRecorder] Could not get test frame from thermal camera")
+                        log.warning("[VideoRecorder] Could not get test frame from thermal camera")
                 else:
-                    print("[VideoRecorder] Thermal camera object not available")
+                    log.warning("[VideoRecorder] Thermal camera object not available")
             else:
-                print("[VideoRecorder] Thermal camera not available for recording")
+                log.warning("[VideoRecorder] Thermal camera not available for recording")
+                
+            # One thread feeds both video writers, so the two videos get
+            # frames captured at the same time
+            if self._normal_queue is not None or self._thermal_queue is not None:
+                video_thread = threading.Thread(
+                    target=self._record_video,
+                    args=(self._normal_queue, self._thermal_queue),
+                    daemon=True
+                )
+                video_thread.start()
+                self.recording_threads.append(video_thread)
                 
             self.recording = True
             return {
@@ -351,26 +646,30 @@ class VideoRecorder:
             }
             
         except Exception as e:
-            print(f"[VideoRecorder] Error starting recording: {e}")
+            log.error("[VideoRecorder] Error starting recording: %s", e)
             import traceback
             traceback.print_exc()
+            # Stop any threads already started, the writer threads release their writers
+            self.stop_flag.set()
             self._cleanup_recording()
             return {"error": str(e)}
             
     def stop_recording(self):
         """Stop all ongoing recording"""
         if not self.recording:
-            print("[VideoRecorder] Not currently recording")
+            log.warning("[VideoRecorder] Not currently recording")
             return {"error": "Not recording"}
             
         try:
-            print("[VideoRecorder] Stopping video recording")
+            log.info("[VideoRecorder] Stopping video recording")
             # Set the stop flag to signal all threads to stop
             self.stop_flag.set()
             
             # Wait for all recording threads to finish (with timeout)
             for thread in self.recording_threads:
                 thread.join(timeout=5.0)
+                if thread.is_alive():
+                    log.warning("[VideoRecorder] %s did not stop in time, leaving it to finish", thread.name)
             
             # Clean up resources
             self._cleanup_recording()
@@ -380,179 +679,380 @@ class VideoRecorder:
                 "success": True,
                 "timestamp": self.timestamp,
                 "directory": self.recording_dir,
-                "frames_recorded": self.frames_recorded
+                "frames_recorded": self.frames_recorded,
+                "frames_dropped": self.frames_dropped
             }
             return result
             
         except Exception as e:
-            print(f"[VideoRecorder] Error stopping recording: {e}")
+            log.error("[VideoRecorder] Error stopping recording: %s", e)
             # Still try to clean up
             self._cleanup_recording()
             return {"error": str(e)}
             
     def _cleanup_recording(self):
         """Clean up recording resources"""
-        # Release video writers
+        # Release video writers. One with a writer thread is released by that
+        # thread when it's done, it may still be in the middle of a write
         if self.normal_video_writer:
-            try:
-                self.normal_video_writer.release()
-            except Exception as e:
-                print(f"[VideoRecorder] Error releasing normal video writer: {e}")
+            if "normal" not in self._writer_threads:
+                self._release_video_writer("normal", self.normal_video_writer)
             self.normal_video_writer = None
             
         if self.thermal_video_writer:
-            try:
-                self.thermal_video_writer.release()
-            except Exception as e:
-                print(f"[VideoRecorder] Error releasing thermal video writer: {e}")
+            if "thermal" not in self._writer_threads:
+                self._release_video_writer("thermal", self.thermal_video_writer)
             self.thermal_video_writer = None
             
         # Reset recording state
         self.recording = False
         self.recording_threads = []
-        print(f"[VideoRecorder] Recording resources cleaned up. Frames recorded: {self.frames_recorded}")
+        self._writer_threads = {}
+        log.info("[VideoRecorder] Recording resources cleaned up. Frames recorded: %s", self.frames_recorded)
         
-    def _record_normal_video(self):
-        """Thread function to record video from the normal camera"""
+    def _record_video(self, normal_queue, thermal_queue):
+        """
+        Thread function that feeds the video writers at video_fps
+        
+        Each frame from the regular camera goes out with the thermal frame
+        captured closest to it (see CameraManager.get_synced_pair), so the two
+        videos stay aligned. Without the regular camera the latest thermal
+        frame is recorded on its own.
+        """
         try:
-            frame_interval = 1.0 / self.video_fps
-            next_frame_time = time.time()
+            thermal_camera = self.camera_manager.get_thermal_camera() if thermal_queue is not None else None
+            frame_interval_ns = int(1e9 / self.video_fps)
+            next_frame_ns = time.monotonic_ns()
             
             while not self.stop_flag.is_set():
-                if not self.camera_manager.is_camera_available() or not self.normal_video_writer:
+                record_normal = (normal_queue is not None and self.normal_video_writer
+                                 and self.camera_manager.is_camera_available())
+                record_thermal = (thermal_camera is not None and self.thermal_video_writer
+                                  and self.camera_manager.is_thermal_available())
+                if not record_normal and not record_thermal:
                     break
                 
                 # Time-based frame capture to maintain consistent FPS
-                current_time = time.time()
-                if current_time >= next_frame_time:
-                    # Calculate next frame time
-                    next_frame_time = current_time + frame_interval
+                now_ns = time.monotonic_ns()
+                if now_ns >= next_frame_ns:
+                    # Advance on a fixed grid, resyncing if we fell a whole frame behind
+                    next_frame_ns += frame_interval_ns
+                    if next_frame_ns <= now_ns:
+                        next_frame_ns = now_ns + frame_interval_ns
                     
-                    # Capture a frame
-                    frame = self.camera_manager.capture_normal_frame()
-                    if frame is not None:
-                        # Write the frame to the video file
-                        self.normal_video_writer.write(frame)
-                        self.frames_recorded["normal"] += 1
-                        
-                        # Print progress occasionally
-                        if self.frames_recorded["normal"] % 100 == 0:
-                            print(f"[VideoRecorder] Normal camera: {self.frames_recorded['normal']} frames recorded")
-                    else:
+                    normal_frame = thermal_frame = None
+                    if record_normal:
+                        pair = self.camera_manager.get_synced_pair()
+                        if pair is not None:
+                            normal_frame, thermal_data, _, _ = pair
+                            if record_thermal and thermal_data is not None:
+                                thermal_frame = thermal_data[0]
+                    elif record_thermal:
+                        frame_data = thermal_camera.get_latest_frame()
+                        if frame_data and isinstance(frame_data, tuple) and len(frame_data) == 2:
+                            thermal_frame = frame_data[0]
+                    
+                    # Hand the frames to the writer threads
+                    if normal_frame is not None:
+                        if self._queue_frame("normal", normal_queue, normal_frame):
+                            # Print progress occasionally
+                            if self.frames_recorded["normal"] % 100 == 0:
+                                log.info("[VideoRecorder] Normal camera: %s frames recorded", self.frames_recorded['normal'])
+                    if thermal_frame is not None:
+                        if self._queue_frame("thermal", thermal_queue, thermal_frame):
+                            if self.frames_recorded["thermal"] % 100 == 0:
+                                log.info("[VideoRecorder] Thermal camera: %s frames recorded", self.frames_recorded['thermal'])
+                    if normal_frame is None and thermal_frame is None:
                         # If we couldn't get a frame, adjust next frame time
-                        next_frame_time = time.time() + frame_interval
+                        next_frame_ns = time.monotonic_ns() + frame_interval_ns
                 
-                # Small sleep to prevent CPU overuse
-                sleep_time = max(0.001, next_frame_time - time.time() - 0.002)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+                # Wait until the next frame is due; wakes immediately on stop
+                wait_ns = max(0, next_frame_ns - time.monotonic_ns())
+                if self.stop_flag.wait(wait_ns / 1e9):
+                    break
                     
-            print(f"[VideoRecorder] Normal camera recording finished, {self.frames_recorded['normal']} frames recorded")
+            if normal_queue is not None:
+                log.info("[VideoRecorder] Normal camera recording finished, %s frames recorded, %s dropped", self.frames_recorded['normal'], self.frames_dropped['normal'])
+            if thermal_queue is not None:
+                log.info("[VideoRecorder] Thermal camera recording finished, %s frames recorded, %s dropped", self.frames_recorded['thermal'], self.frames_dropped['thermal'])
             
         except Exception as e:
-            print(f"[VideoRecorder] Error in normal video recording thread: {e}")
+            log.error("[VideoRecorder] Error in video recording thread: %s", e)
             import traceback
             traceback.print_exc()
             
-    def _record_thermal_video(self):
-        """Thread function to record video from the thermal camera"""
+        finally:
+            if normal_queue is not None:
+                self._finish_queue(normal_queue)
+            if thermal_queue is not None:
+                self._finish_queue(thermal_queue)
+            
+    def _queue_frame(self, name, frame_queue, frame):
+        """Queue a frame for a writer thread, dropping it if the writer is behind"""
         try:
-            thermal_camera = self.camera_manager.get_thermal_camera()
-            if not thermal_camera:
-                print("[VideoRecorder] No thermal camera available for recording")
-                return
-                
-            frame_interval = 1.0 / self.video_fps
-            next_frame_time = time.time()
+            frame_queue.put_nowait(frame)
+        except queue.Full:
+            self.frames_dropped[name] += 1
+            return False
+        self.frames_recorded[name] += 1
+        return True
+        
+    def _finish_queue(self, frame_queue):
+        """Tell a writer thread that no more frames are coming"""
+        try:
+            frame_queue.put(None, timeout=5.0)
+        except queue.Full:
+            log.warning("[VideoRecorder] Writer thread did not drain its queue")
             
-            while not self.stop_flag.is_set():
-                if not self.camera_manager.is_thermal_available() or not self.thermal_video_writer:
+    def _release_video_writer(self, name, writer):
+        """Release a VideoWriter, finishing its file"""
+        try:
+            writer.release()
+        except Exception as e:
+            log.error("[VideoRecorder] Error releasing %s video writer: %s", name, e)
+            
+    def _next_queued(self, frame_queue, stop_flag):
+        """Wait for the next queued frame, None once the recording has ended"""
+        while True:
+            try:
+                return frame_queue.get(timeout=WRITER_POLL_INTERVAL)
+            except queue.Empty:
+                # The recording thread ends the queue with None, but that can
+                # time out, so also stop once recording stopped and it's drained
+                if stop_flag.is_set():
+                    return None
+            
+    def _video_writer_loop(self, name, frame_queue, writer, stop_flag):
+        """Thread function that encodes queued frames with a VideoWriter, releasing it at the end"""
+        try:
+            while True:
+                frame = self._next_queued(frame_queue, stop_flag)
+                if frame is None:
                     break
+                writer.write(frame)
                 
-                # Time-based frame capture to maintain consistent FPS
-                current_time = time.time()
-                if current_time >= next_frame_time:
-                    # Calculate next frame time
-                    next_frame_time = current_time + frame_interval
-                    
-                    # Get the latest frame
-                    frame_data = thermal_camera.get_latest_frame()
-                    if frame_data and isinstance(frame_data, tuple) and len(frame_data) == 2:
-                        frame, _ = frame_data
-                        # Write the frame to the video file
-                        self.thermal_video_writer.write(frame)
-                        self.frames_recorded["thermal"] += 1
-                        
-                        # Print progress occasionally
-                        if self.frames_recorded["thermal"] % 100 == 0:
-                            print(f"[VideoRecorder] Thermal camera: {self.frames_recorded['thermal']} frames recorded")
-                    else:
-                        # If we couldn't get a frame, adjust next frame time
-                        next_frame_time = time.time() + frame_interval
-                
-                # Small sleep to prevent CPU overuse
-                sleep_time = max(0.001, next_frame_time - time.time() - 0.002)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                    
-            print(f"[VideoRecorder] Thermal camera recording finished, {self.frames_recorded['thermal']} frames recorded")
-            
         except Exception as e:
-            print(f"[VideoRecorder] Error in thermal video recording thread: {e}")
+            log.error("[VideoRecorder] Error in %s video writer thread: %s", name, e)
             import traceback
             traceback.print_exc()
             
+        finally:
+            self._release_video_writer(name, writer)
+            
     def _record_thermal_data(self):
-        """Thread function to record thermal data as .npy files at specified FPS"""
+        """Thread function to record thermal data into a .npy file at specified FPS"""
         try:
             thermal_camera = self.camera_manager.get_thermal_camera()
             if not thermal_camera:
-                print("[VideoRecorder] No thermal camera available for thermal data recording")
+                log.warning("[VideoRecorder] No thermal camera available for thermal data recording")
                 return
             
             # Calculate frame interval based on requested FPS
-            frame_interval = 1.0 / self.thermal_data_fps
-            next_frame_time = time.time()
+            frame_interval_ns = int(1e9 / self.thermal_data_fps)
+            next_frame_ns = time.monotonic_ns()
             
-            print(f"[VideoRecorder] Thermal data recording started at {self.thermal_data_fps} FPS (interval: {frame_interval:.4f}s)")
+            log.info("[VideoRecorder] Thermal data recording started at %s FPS (interval: %.4fs)", self.thermal_data_fps, frame_interval_ns / 1e9)
                 
             while not self.stop_flag.is_set():
                 if not self.camera_manager.is_thermal_available():
                     break
                 
                 # Time-based frame capture to maintain consistent FPS
-                current_time = time.time()
-                if current_time >= next_frame_time:
-                    # Calculate next frame time
-                    next_frame_time = current_time + frame_interval
+                now_ns = time.monotonic_ns()
+                if now_ns >= next_frame_ns:
+                    # Advance on a fixed grid, resyncing if we fell a whole frame behind
+                    next_frame_ns += frame_interval_ns
+                    if next_frame_ns <= now_ns:
+                        next_frame_ns = now_ns + frame_interval_ns
                     
                     # Check if we have access to raw temperature data
-                    if hasattr(thermal_camera, '_raw_temps') and thermal_camera._raw_temps is not None:
-                        # Save the raw temperature data
-                        npy_path = os.path.join(self.thermal_data_dir, f"temp_data_{self.frames_recorded['thermal_data']:06d}.npy")
-                        raw_temps = thermal_camera._raw_temps.copy()  # Copy to avoid race conditions
-                        
-                        np.save(npy_path, raw_temps)
-                        self.frames_recorded["thermal_data"] += 1
-                        
-                        # Print progress occasionally
-                        if self.frames_recorded["thermal_data"] % 10 == 0:
-                            print(f"[VideoRecorder] Thermal data: {self.frames_recorded['thermal_data']} frames saved at {self.thermal_data_fps} FPS")
+                    raw_temps = thermal_camera.acquire_latest_raw()
+                    if raw_temps is not None:
+                        # Save the raw temperature data; the array is read-only, so no copy
+                        if self._queue_frame("thermal_data", self._npy_queue, raw_temps):
+                            # Print progress occasionally
+                            if self.frames_recorded["thermal_data"] % 10 == 0:
+                                log.info("[VideoRecorder] Thermal data: %s frames saved at %s FPS", self.frames_recorded['thermal_data'], self.thermal_data_fps)
                     else:
                         # If raw temps not available, adjust next frame time
-                        next_frame_time = time.time() + frame_interval
+                        next_frame_ns = time.monotonic_ns() + frame_interval_ns
                 
-                # Small sleep to prevent CPU overuse
-                sleep_time = max(0.001, next_frame_time - time.time() - 0.002)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+                # Wait until the next frame is due; wakes immediately on stop
+                wait_ns = max(0, next_frame_ns - time.monotonic_ns())
+                if self.stop_flag.wait(wait_ns / 1e9):
+                    break
                     
-            print(f"[VideoRecorder] Thermal data recording finished, {self.frames_recorded['thermal_data']} frames saved")
+            log.info("[VideoRecorder] Thermal data recording finished, %s frames saved, %s dropped", self.frames_recorded['thermal_data'], self.frames_dropped['thermal_data'])
             
         except Exception as e:
-            print(f"[VideoRecorder] Error in thermal data recording thread: {e}")
+            log.error("[VideoRecorder] Error in thermal data recording thread: %s", e)
             import traceback
             traceback.print_exc()
+            
+        finally:
+            self._finish_queue(self._npy_queue)
+            
+    def _npy_writer_loop(self, npy_queue, npy_path, stop_flag):
+        """Thread function that appends queued thermal data frames to the recording's .npy file"""
+        npy_file = None
+        frame_shape = None
+        frame_dtype = None
+        frames_written = 0
+        
+        try:
+            while True:
+                raw_temps = self._next_queued(npy_queue, stop_flag)
+                if raw_temps is None:
+                    break
+                    
+                if npy_file is None:
+                    frame_shape = raw_temps.shape
+                    frame_dtype = raw_temps.dtype
+                    npy_file = open(npy_path, "wb")
+                    npy_file.write(_npy_header(frame_dtype, (0,) + frame_shape))
+                elif raw_temps.shape != frame_shape:
+                    # The .npy file holds one shape; count the frame as dropped
+                    # rather than saved so the recording result shows the gap
+                    self.frames_dropped["thermal_data"] += 1
+                    self.frames_recorded["thermal_data"] -= 1
+                    log.warning("[VideoRecorder] Dropping thermal data frame of shape %s, recording is %s",
+                                raw_temps.shape, frame_shape, extra=RATE_LIMITED)
+                    continue
+                    
+                np.ascontiguousarray(raw_temps, dtype=frame_dtype).tofile(npy_file)
+                frames_written += 1
+                
+                # Keep the header current so the file stays loadable after a crash
+                if frames_written % 30 == 0:
+                    npy_file.seek(0)
+                    npy_file.write(_npy_header(frame_dtype, (frames_written,) + frame_shape))
+                    npy_file.seek(0, os.SEEK_END)
+                    
+        except Exception as e:
+            log.error("[VideoRecorder] Error in thermal data writer thread: %s", e)
+            import traceback
+            traceback.print_exc()
+            
+        finally:
+            if npy_file is not None:
+                try:
+                    # Rewrite the header with the final frame count
+                    npy_file.seek(0)
+                    npy_file.write(_npy_header(frame_dtype, (frames_written,) + frame_shape))
+                    npy_file.close()
+                    log.info("[VideoRecorder] Wrote %s thermal data frames to %s", frames_written, npy_path)
+                except Exception as e:
+                    log.error("[VideoRecorder] Error finalizing thermal data file: %s", e)
+
+# How long is_thermal_available() reuses its last answer, in seconds
+THERMAL_AVAILABLE_TTL = 0.5
+
+# Longest cleanup() waits for the recorder and cameras to shut down, in seconds
+CLEANUP_TIMEOUT = 8.0
+
+# Name of the shared memory ring regular camera frames are published to for
+# other processes (None disables it), and how many frames it holds
+SHARED_RING_NAME = None
+SHARED_RING_SLOTS = 4
+
+# Size of the JPEG preview stream encoded from the camera's low-resolution
+# output (None disables it)
+PREVIEW_JPEG_SIZE = None
+
+if JPEG_ENCODER_AVAILABLE:
+    class _LatestJpegOutput(Output):
+        """Encoder output that only keeps the newest JPEG"""
+        def __init__(self):
+            super().__init__()
+            self._lock = threading.Lock()
+            self.jpeg = None
+            
+        def outputframe(self, frame, *args, **kwargs):
+            data = bytes(frame)
+            with self._lock:
+                self.jpeg = data
+                
+        def latest(self):
+            with self._lock:
+                return self.jpeg
+
+class SharedFrameRing:
+    """
+    Ring of camera frames in POSIX shared memory.
+    
+    The header holds the number of frames written so far (uint64), followed
+    by the slot count, height, width and channels (uint32). Frame i lives in
+    slot i % slots. The writer never waits for readers, so a reader that
+    copies a slot should check the count afterwards: if it advanced by slots
+    or more, the copy may be torn.
+    """
+    HEADER_SIZE = 64
+    
+    def __init__(self, name, shape=None, slots=SHARED_RING_SLOTS, create=True):
+        if create:
+            height, width, channels = shape
+            size = self.HEADER_SIZE + slots * height * width * channels
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            struct.pack_into("<QIIII", self._shm.buf, 0, 0, slots, height, width, channels)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            _, slots, height, width, channels = struct.unpack_from("<QIIII", self._shm.buf, 0)
+        self.name = self._shm.name
+        self.owner = create
+        self.slots = slots
+        self.shape = (height, width, channels)
+        self._count = np.ndarray((1,), dtype=np.uint64, buffer=self._shm.buf[:8])
+        self._slots = np.ndarray(
+            (slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf[self.HEADER_SIZE:]
+        )
+        
+    @classmethod
+    def attach(cls, name):
+        """Open an existing ring from another process."""
+        return cls(name, create=False)
+        
+    @property
+    def count(self):
+        """Number of frames written so far."""
+        return int(self._count[0])
+        
+    def write(self, frame):
+        """Copy a frame into the next slot and then publish it."""
+        count = int(self._count[0])
+        np.copyto(self._slots[count % self.slots], frame)
+        self._count[0] = count + 1
+        
+    def slot_view(self, slot_idx):
+        """Zero-copy view of one slot."""
+        return self._slots[slot_idx % self.slots]
+        
+    def latest(self):
+        """(count, view) of the newest frame, or (0, None) before the first one."""
+        count = int(self._count[0])
+        if count == 0:
+            return 0, None
+        return count, self._slots[(count - 1) % self.slots]
+        
+    def close(self):
+        """Detach from the ring, removing it if this process created it."""
+        # The numpy views have to go before the mapping can be closed
+        self._count = None
+        self._slots = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # A slot_view() is still held somewhere; the mapping goes when it does
+            log.warning("[Camera] Shared frame ring still has views open, leaving it mapped")
+        if self.owner:
+            self._shm.unlink()
+
+class _CamState:
+    """Which cameras are up, kept current on init and cleanup so checks are one attribute read"""
+    __slots__ = ("main_ok", "thermal_ok")
+    
+    def __init__(self):
+        self.main_ok = False
+        self.thermal_ok = False
 
 class CameraManager:
     """Manages all camera operations for the drone system"""
@@ -560,6 +1060,39 @@ class CameraManager:
         # Initialize camera instances as None
         self.camera_instance = None
         self.thermal_camera_instance = None
+        self._state = _CamState()
+        
+        # Capture thread filling two preallocated frame buffers in turn; readers
+        # always see the most recently completed one
+        self._buffers = None
+        self._read_idx = None
+        self._frame_seq = 0
+        self._frame_ns = 0  # time.monotonic_ns() when the latest frame was captured
+        self._frame_lock = threading.Lock()
+        self._capture_thread = None
+        self._running = False
+        self._shared_ring = None
+        self._preview_encoder = None
+        self._preview_output = None
+        # Frames still need the 180 degree flip unless the ISP already did it
+        self.software_flip = True
+        
+        # Camera requests currently borrowed, so cleanup can hand them back
+        self._outstanding_requests = set()
+        self._request_lock = threading.Lock()
+        
+        # Capture counters for get_metrics(); capture_ns is the time from a frame
+        # arriving to it being published, i.e. the CPU cost per frame
+        self._metrics = {"captured": 0, "errors": 0, "capture_ns_total": 0, "copies": 0}
+        self._capture_ns = deque(maxlen=1024)
+        self._fps_sample = (time.monotonic(), 0)
+        
+        # cleanup() runs once until a camera is initialized again
+        self._cleanup_lock = threading.RLock()
+        self._closed = False
+        
+        # Last is_thermal_available() result and when it was checked
+        self._thermal_ok_cached = (False, float('-inf'))
         
         # Create video recorder
         self.video_recorder = VideoRecorder(self)
@@ -572,74 +1105,108 @@ class CameraManager:
         """Initialize the regular camera (PiCamera2)"""
         if CAMERA_AVAILABLE and self.camera_instance is None:
             try:
-                print("[Camera] Initializing PiCamera2")
+                log.info("[Camera] Initializing PiCamera2")
                 self.camera_instance = Picamera2()
                 self.camera_instance.preview_configuration.main.size = (1280, 960)
                 self.camera_instance.preview_configuration.main.format = "RGB888"
+                # Keep the request queue shallow so capture_array returns a fresh frame.
+                # libcamera needs two buffers to stream without stalling; raise this
+                # if downstream jitter regularly exceeds one frame interval.
+                self.camera_instance.preview_configuration.buffer_count = 2
+                self.camera_instance.preview_configuration.queue = False
+                if PREVIEW_JPEG_SIZE is not None and JPEG_ENCODER_AVAILABLE:
+                    self.camera_instance.preview_configuration.enable_lores()
+                    self.camera_instance.preview_configuration.lores.size = PREVIEW_JPEG_SIZE
                 self.camera_instance.preview_configuration.align()
-                self.camera_instance.configure("preview")
+                self.software_flip = not self._configure_with_transform()
                 self.camera_instance.start()
-                print("[Camera] PiCamera2 initialized and started")
+                log.info("[Camera] PiCamera2 initialized and started")
+                self._start_preview_encoder()
+                
+                # Start the capture thread
+                self._running = True
+                self._capture_thread = threading.Thread(
+                    target=self._capture_loop,
+                    daemon=True
+                )
+                self._capture_thread.start()
+                self._state.main_ok = True
+                self._closed = False
                 return True
             except Exception as e:
-                print(f"[Camera] Error initializing PiCamera2: {e}")
+                log.error("[Camera] Error initializing PiCamera2: %s", e)
                 self.camera_instance = None
+                self._state.main_ok = False
                 return False
         return self.camera_instance is not None
     
+    def _start_preview_encoder(self):
+        """Encode the low-resolution stream to JPEG in hardware, if enabled"""
+        if PREVIEW_JPEG_SIZE is None or not JPEG_ENCODER_AVAILABLE:
+            return
+        try:
+            encoder = MJPEGEncoder()
+            output = _LatestJpegOutput()
+            self.camera_instance.start_encoder(encoder, output, name="lores")
+            self._preview_encoder = encoder
+            self._preview_output = output
+            log.info("[Camera] JPEG preview stream started at %s", PREVIEW_JPEG_SIZE)
+        except Exception as e:
+            log.error("[Camera] Error starting JPEG preview encoder: %s", e)
+    
+    def _configure_with_transform(self):
+        """
+        Configure the camera with the 180 degree flip done by the ISP.
+        
+        Returns True if the sensor accepted the transform; otherwise the camera
+        is configured without it and frames have to be flipped in software.
+        """
+        config = self.camera_instance.preview_configuration
+        if TRANSFORM_AVAILABLE:
+            try:
+                config.transform = Transform(hflip=1, vflip=1)
+                self.camera_instance.configure("preview")
+                log.info("[Camera] Using ISP transform for the 180 degree flip")
+                return True
+            except Exception as e:
+                log.warning("[Camera] ISP transform not supported, flipping in software: %s", e)
+                config.transform = Transform()
+        self.camera_instance.configure("preview")
+        return False
+    
     def _initialize_thermal_camera(self):
         """Initialize the thermal camera"""
+        self._thermal_ok_cached = (False, float('-inf'))
+        self._state.thermal_ok = False
+        
         # Clean up old instance if it exists
         if self.thermal_camera_instance is not None:
             try:
                 self.thermal_camera_instance.close()
             except Exception as e:
-                print(f"[Camera] Error closing existing thermal camera: {e}")
+                log.error("[Camera] Error closing existing thermal camera: %s", e)
         
         try:
             # Check if existing camera needs to be verified
             if self.thermal_camera_instance is not None:
                 try:
-                    if self.thermal_camera_instance.cap.isOpened():
-                        print("[Camera] Existing thermal camera instance is open")
+                    if self.thermal_camera_instance.available:
+                        log.info("[Camera] Existing thermal camera instance is open")
+                        self._state.thermal_ok = True
+                        self._closed = False
                         return True
-                    print("[Camera] Existing thermal camera instance is not open, reinitializing")
+                    log.warning("[Camera] Existing thermal camera instance is not open, reinitializing")
                 except Exception:
-                    print("[Camera] Error checking existing thermal camera, reinitializing")
+                    log.error("[Camera] Error checking existing thermal camera, reinitializing")
             
             # Try specific device path first
             device_candidates = ['/dev/andrei']
             
-            # Look for available video devices
-            picam_device = None  # Camera device used by PiCamera2
-            available_cameras = []
-            
-            # First check if a PiCamera2 instance exists and is using a device
-            if self.camera_instance and CAMERA_AVAILABLE:
-                try:
-                    # On Raspberry Pi, PiCamera2 typically uses /dev/video0
-                    picam_device = 0
-                    print(f"[Camera] PiCamera2 is active, likely using device {picam_device}")
-                except Exception:
-                    pass
-            
-            # Find available cameras
-            for i in range(10):  # Try devices 0-9
-                # Skip the device used by PiCamera2
-                if i == picam_device:
-                    print(f"[Camera] Skipping camera device {i} (used by PiCamera2)")
-                    continue
-                    
-                try:
-                    cap = cv2.VideoCapture(i)
-                    if cap.isOpened():
-                        available_cameras.append(i)
-                        print(f"[Camera] Found available camera at index {i}")
-                        cap.release()
-                except Exception:
-                    pass
+            # List capture devices from sysfs, skipping the PiCamera2 pipeline nodes
+            skip_names = PI_CAMERA_DEVICE_NAMES if self._state.main_ok else ()
+            available_cameras = get_available_video_devices(skip_names)
             
-            print(f"[Camera] Available camera devices: {available_cameras}")
+            log.info("[Camera] Available camera devices: %s", available_cameras)
             
             # Prioritize cameras other than device 0 (it's usually the built-in webcam)
             thermal_candidates = []
@@ -656,40 +1223,54 @@ class CameraManager:
             # Try each path
             for path in device_candidates:
                 try:
-                    print(f"[Camera] Trying to initialize thermal camera with device {path}")
+                    log.info("[Camera] Trying to initialize thermal camera with device %s", path)
                     self.thermal_camera_instance = ThermalCamera(device_path=path)
                     
                     # Verify the camera is working
-                    if self.thermal_camera_instance.cap.isOpened():
-                        print(f"[Camera] Thermal camera initialized successfully with device {path}")
+                    if self.thermal_camera_instance.available:
+                        log.info("[Camera] Thermal camera initialized successfully with device %s", path)
+                        self._state.thermal_ok = True
+                        self._closed = False
                         return True
                     else:
-                        print(f"[Camera] Failed to open thermal camera with device {path}")
+                        log.warning("[Camera] Failed to open thermal camera with device %s", path)
                         self.thermal_camera_instance.close()
                         self.thermal_camera_instance = None
                 except Exception as e:
-                    print(f"[Camera] Error initializing thermal camera with device {path}: {e}")
+                    log.error("[Camera] Error initializing thermal camera with device %s: %s", path, e)
             
-            print("[Camera] Could not initialize thermal camera with any available device")
+            log.warning("[Camera] Could not initialize thermal camera with any available device")
             return False
             
         except Exception as e:
-            print(f"[Camera] Error in thermal camera initialization process: {e}")
+            log.error("[Camera] Error in thermal camera initialization process: %s", e)
             return False
     
     def is_camera_available(self):
         """Check if the regular camera is available"""
-        return self.camera_instance is not None and CAMERA_AVAILABLE
+        return self._state.main_ok
     
     def is_thermal_available(self):
-        """Check if the thermal camera is available and working"""
-        if self.thermal_camera_instance is None:
+        """Check if the thermal camera is available and working (cached briefly)"""
+        if not self._state.thermal_ok:
             return False
+        now = time.monotonic()
+        available, checked_at = self._thermal_ok_cached
+        if now - checked_at < THERMAL_AVAILABLE_TTL:
+            return available
             
-        try:
-            return self.thermal_camera_instance.cap.isOpened()
-        except Exception:
-            return False
+        cap = getattr(self.thermal_camera_instance, 'cap', None)
+        if cap is None:
+            available = False
+        else:
+            try:
+                available = cap.isOpened()
+            except (cv2.error, RuntimeError, OSError) as e:
+                log.error("[Camera] Error checking thermal camera: %s", e, extra=RATE_LIMITED)
+                available = False
+                
+        self._thermal_ok_cached = (available, now)
+        return available
     
     def get_camera(self):
         """Get the regular camera instance, initializing if needed"""
@@ -703,18 +1284,194 @@ class CameraManager:
             self._initialize_thermal_camera()
         return self.thermal_camera_instance
     
-    def capture_normal_frame(self):
-        """Capture a frame from the regular camera"""
-        if not self.is_camera_available():
-            return None
+    def _capture_loop(self):
+        """Thread function that copies camera frames into the ping-pong buffers"""
+        camera = self.camera_instance
+        write_idx = 0
+        while self._running:
+            try:
+                with self._borrow_frame(camera) as array:
+                    captured_ns = time.monotonic_ns()
+                    if self._buffers is None:
+                        self._buffers = [np.empty(array.shape, dtype=np.uint8) for _ in range(2)]
+                        self._open_shared_ring(array.shape)
+                    # Readers only touch the other buffer, so no lock is needed here
+                    np.copyto(self._buffers[write_idx], array)
+                    if self._shared_ring is not None:
+                        self._shared_ring.write(array)
+            except Exception as e:
+                self._metrics["errors"] += 1
+                log.error("[Camera] Error capturing frame: %s", e, extra=RATE_LIMITED)
+                time.sleep(0.1)
+                continue
+                
+            # Publish the buffer we just filled and write into the other one next
+            with self._frame_lock:
+                self._read_idx = write_idx
+                self._frame_seq += 1
+                self._frame_ns = captured_ns
+            write_idx ^= 1
             
+            elapsed_ns = time.monotonic_ns() - captured_ns
+            self._metrics["captured"] += 1
+            self._metrics["capture_ns_total"] += elapsed_ns
+            self._capture_ns.append(elapsed_ns)
+                
+        log.info("[Camera] Capture thread stopped")
+        
+    def _open_shared_ring(self, shape):
+        """Create the shared memory ring for other processes, if enabled"""
+        if SHARED_RING_NAME is None:
+            return
         try:
-            # Capture and flip the frame
-            frame = self.camera_instance.capture_array()
-            return cv2.flip(frame, -1)
+            self._shared_ring = SharedFrameRing(SHARED_RING_NAME, shape)
+            log.info("[Camera] Publishing frames to shared memory '%s'", SHARED_RING_NAME)
         except Exception as e:
-            print(f"[Camera] Error capturing frame: {e}")
+            log.error("[Camera] Error creating shared frame ring: %s", e)
+            self._shared_ring = None
+    
+    def get_frame_view(self, slot_idx):
+        """
+        Zero-copy view of one slot of the shared frame ring, or None if it's disabled.
+        
+        Frames are oriented like latest_frame(). Other processes use
+        SharedFrameRing.attach(SHARED_RING_NAME) instead.
+        """
+        if self._shared_ring is None:
+            return None
+        return self._shared_ring.slot_view(slot_idx)
+    
+    @contextmanager
+    def _borrow_frame(self, camera):
+        """Borrow the next camera frame as a zero-copy view of its DMA buffer, released on exit"""
+        request = camera.capture_request()
+        with self._request_lock:
+            self._outstanding_requests.add(request)
+        try:
+            with MappedArray(request, "main") as mapped:
+                yield mapped.array
+        finally:
+            # cleanup() may already have released it
+            with self._request_lock:
+                owned = request in self._outstanding_requests
+                self._outstanding_requests.discard(request)
+            if owned:
+                request.release()
+                
+    def _release_outstanding_requests(self):
+        """Hand any still-borrowed requests back to the camera"""
+        with self._request_lock:
+            requests = list(self._outstanding_requests)
+            self._outstanding_requests.clear()
+        for request in requests:
+            try:
+                request.release()
+            except Exception as e:
+                log.error("[Camera] Error releasing camera request: %s", e)
+        
+    @contextmanager
+    def latest_frame(self):
+        """
+        Hold the latest frame and its sequence number without copying.
+        
+        The frame is upright only if software_flip is False.
+        
+        The capture thread can't reuse the buffer until the block exits, so keep
+        the work inside it short. Yields (None, 0) before the first frame.
+        """
+        with self._frame_lock:
+            if self._read_idx is None:
+                yield None, 0
+            else:
+                yield self._buffers[self._read_idx], self._frame_seq
+    
+    def capture_normal_frame(self, flip=True):
+        """
+        Get a copy of the latest frame from the regular camera without waiting for the sensor.
+        
+        The capture buffers are reused, so the caller gets its own array. With
+        flip the frame comes back upright: the ISP has normally flipped it
+        already, otherwise the flip is applied as part of the copy.
+        """
+        if not self._state.main_ok:
+            return None
+            
+        with self.latest_frame() as (frame, _):
+            if frame is None:
+                return None
+            self._metrics["copies"] += 1
+            return self._copy_frame(frame, flip)
+    
+    def _copy_frame(self, frame, flip):
+        """Copy a capture buffer, flipping it upright if asked and the ISP didn't"""
+        if flip and self.software_flip:
+            return np.ascontiguousarray(frame[::-1, ::-1])
+        return frame.copy()
+    
+    def get_metrics(self):
+        """
+        Capture counters for the regular camera.
+        
+        fps is averaged since the previous call; the capture latency
+        percentiles (in microseconds) cover the last 1024 frames.
+        """
+        metrics = dict(self._metrics)
+        now = time.monotonic()
+        last_time, last_captured = self._fps_sample
+        self._fps_sample = (now, metrics["captured"])
+        elapsed = now - last_time
+        metrics["fps"] = round((metrics["captured"] - last_captured) / elapsed, 2) if elapsed > 0 else 0.0
+        
+        attempts = metrics["captured"] + metrics["errors"]
+        metrics["error_rate"] = round(metrics["errors"] / attempts, 4) if attempts else 0.0
+        
+        samples = sorted(self._capture_ns)
+        if samples:
+            metrics["capture_us_avg"] = round(metrics["capture_ns_total"] / metrics["captured"] / 1000, 1)
+            metrics["capture_us_p50"] = round(samples[len(samples) // 2] / 1000, 1)
+            metrics["capture_us_p99"] = round(samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1000, 1)
+        return metrics
+    
+    def capture_preview_jpeg(self):
+        """
+        Get the latest JPEG from the hardware-encoded preview stream.
+        
+        Returns None if PREVIEW_JPEG_SIZE is unset or no frame has been
+        encoded yet. Like latest_frame(), previews are upright only if
+        software_flip is False.
+        """
+        output = self._preview_output
+        if output is None:
+            return None
+        return output.latest()
+    
+    def get_synced_pair(self, flip=True):
+        """
+        Get the latest regular frame together with the thermal frame captured closest to it.
+        
+        Returns (rgb, thermal, t_rgb, t_thermal) with the times from
+        time.monotonic_ns(); thermal is (processed_frame, temp_data) like
+        ThermalCamera.get_latest_frame(). thermal and t_thermal are None if no
+        thermal frame is available, and None is returned before the first
+        regular frame.
+        """
+        if not self._state.main_ok:
             return None
+            
+        with self._frame_lock:
+            if self._read_idx is None:
+                return None
+            t_rgb = self._frame_ns
+            rgb = self._copy_frame(self._buffers[self._read_idx], flip)
+            
+        thermal, t_thermal = None, None
+        thermal_camera = self.thermal_camera_instance
+        if self._state.thermal_ok and thermal_camera is not None:
+            nearest = thermal_camera.get_frame_near(t_rgb)
+            if nearest is not None:
+                t_thermal, processed_frame, temp_data = nearest
+                thermal = (processed_frame, temp_data)
+        return rgb, thermal, t_rgb, t_thermal
     
     def start_video_recording(self, thermal_data_fps=1):
         """Start recording video from both cameras"""
@@ -729,27 +1486,99 @@ class CameraManager:
         return self.video_recorder.recording
     
     def cleanup(self):
-        """Clean up camera resources"""
-        print("[Camera] Cleaning up camera resources")
-        
-        # Stop recording if active
-        if self.video_recorder.recording:
-            self.video_recorder.stop_recording()
+        """
+        Clean up camera resources.
         
-        # Close the thermal camera
-        if self.thermal_camera_instance is not None:
-            try:
-                self.thermal_camera_instance.close()
-                print("[Camera] Thermal camera closed")
-            except Exception as e:
-                print(f"[Camera] Error closing thermal camera: {e}")
+        Stopping the recorder (which finalizes the video files) and the two
+        cameras each block on device I/O, so they run side by side and the
+        total time is that of the slowest, bounded by CLEANUP_TIMEOUT. Safe to
+        call more than once and from several threads.
+        """
+        with self._cleanup_lock:
+            if self._closed:
+                return
+            log.info("[Camera] Cleaning up camera resources")
+            
+            # Consumers see the cameras as gone while they shut down, and a
+            # second caller finds nothing left to stop
+            self._state.main_ok = False
+            self._state.thermal_ok = False
+            camera = self.camera_instance
+            thermal_camera = self.thermal_camera_instance
+            self.camera_instance = None
             self.thermal_camera_instance = None
+            self._thermal_ok_cached = (False, float('-inf'))
+            
+            steps = []
+            # Stop recording if active
+            if self.video_recorder.recording:
+                steps.append(("stopping recording", self.video_recorder.stop_recording))
+            # Close the thermal camera
+            if thermal_camera is not None:
+                steps.append(("closing thermal camera", lambda: self._close_thermal_camera(thermal_camera)))
+            # Stop the regular camera
+            if camera is not None or self._capture_thread is not None:
+                steps.append(("stopping regular camera", lambda: self._stop_regular_camera(camera)))
+            
+            if steps:
+                errors = {}
+                
+                def run_step(name, step):
+                    try:
+                        step()
+                    except Exception as e:
+                        errors[name] = e
+                        
+                # Daemon threads rather than an executor, whose workers are
+                # joined at exit, so a hung device can't hold up the rest of
+                # the shutdown or the process exit
+                threads = [
+                    (name, threading.Thread(target=run_step, args=(name, step), daemon=True))
+                    for name, step in steps
+                ]
+                for _, thread in threads:
+                    thread.start()
+                deadline = time.monotonic() + CLEANUP_TIMEOUT
+                for name, thread in threads:
+                    thread.join(max(0.0, deadline - time.monotonic()))
+                    if thread.is_alive():
+                        log.warning("[Camera] Gave up waiting for %s after %ss", name, CLEANUP_TIMEOUT)
+                    elif name in errors:
+                        log.error("[Camera] Error %s: %s", name, errors[name])
+            
+            self._closed = True
+    
+    def _close_thermal_camera(self, thermal_camera):
+        """Close the thermal camera (run from cleanup)"""
+        thermal_camera.close()
+        log.info("[Camera] Thermal camera closed")
+    
+    def _stop_regular_camera(self, camera):
+        """Stop the capture thread and then the camera it reads from (run from cleanup)"""
+        self._running = False
+        thread = self._capture_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=2.0)
+            if thread.is_alive():
+                # It may still be copying out of a borrowed request or into the
+                # ring; its own finally releases the request once it gets out
+                log.warning("[Camera] Capture thread didn't stop, leaving the camera running")
+                return
+        self._capture_thread = None
+        self._release_outstanding_requests()
         
-        # Stop the regular camera
-        if self.camera_instance is not None and CAMERA_AVAILABLE:
+        if self._shared_ring is not None:
+            self._shared_ring.close()
+            self._shared_ring = None
+        
+        if self._preview_encoder is not None:
             try:
-                self.camera_instance.stop()
-                print("[Camera] Regular camera stopped")
+                camera.stop_encoder(self._preview_encoder)
             except Exception as e:
-                print(f"[Camera] Error stopping regular camera: {e}")
-            self.camera_instance = None
\ No newline at end of file
+                log.error("[Camera] Error stopping JPEG preview encoder: %s", e)
+            self._preview_encoder = None
+            self._preview_output = None
+        
+        if camera is not None:
+            camera.stop()
+            log.info("[Camera] Regular camera stopped")
\ No newline at end of file
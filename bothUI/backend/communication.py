@@ -10,6 +10,11 @@ import asyncio
 import socketio
 import time
 import json
+import re
+import traceback
+import logging
+import threading
+import socket
 
 from aiortc import (
     RTCPeerConnection,
@@ -18,102 +23,365 @@ from aiortc import (
     RTCSessionDescription
 )
 
+# Stream tracks are optional so signaling still works without the camera stack
+try:
+    from camera_manager import GlobalCameraStreamTrack, ThermalCameraStreamTrack
+except ImportError:
+    GlobalCameraStreamTrack = ThermalCameraStreamTrack = None
+
+log = logging.getLogger("comm")
+
+# orjson serializes in C; fall back to the standard library without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+else:
+    _dumps = json.dumps
+
+# LOCATION:lat:lon:rel_alt:alt, 7 decimals is ~1 cm of latitude
+_LOC_FMT = "LOCATION:%.7f:%.7f:%.2f:%.2f"
+
+# Outgoing messages are joined with newlines and sent together every
+# OUTBOX_INTERVAL seconds, or straight away once OUTBOX_FLUSH_SIZE are queued
+OUTBOX_INTERVAL = 0.02
+OUTBOX_FLUSH_SIZE = 8
+OUTBOX_MAX_BATCH = 100
+# Hold batches back while this much is still waiting in the SCTP send buffer
+OUTBOX_MAX_BUFFERED = 5 * 16384
+
+# Soft real-time messages sent on the unordered, unreliable "ctrl" channel;
+# a lost one is superseded by the next. Heartbeats stay on the reliable
+# channel, the admin reports the link lost when they stop arriving
+_CONTROL_PREFIXES = ("LOCATION:",)
+
+# Incoming messages waiting for the command worker; more than this are dropped
+RX_QUEUE_SIZE = 256
+
+# Heartbeats are only echoed if nothing else was sent for this long, in seconds
+HEARTBEAT_IDLE = 1.0
+
+_LED_PREFIX = "LED_SET_COLOR:"
+_LED_PREFIX_LEN = len(_LED_PREFIX)
+_SURVEILLANCE_PREFIX_LEN = len("START_SURVEILLANCE:")
+
+# Surveillance area points, "lat:lon" pairs separated by commas
+_COORD = r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?"
+_POINT_RE = re.compile(rf"({_COORD}):({_COORD})")
+_POINTS_RE = re.compile(rf"{_COORD}:{_COORD}(?:,{_COORD}:{_COORD})*")
+
+# Allowed ranges for the numeric mission parameters: (name, low, high, error reply)
+_SURVEILLANCE_LIMITS = tuple(
+    (name, low, high, f"SURVEILLANCE_ERROR:Invalid {name} ({low}-{high} {unit})")
+    for name, low, high, unit in (
+        ("speed", 1, 15, "m/s"),
+        ("altitude", 10, 120, "m"),
+        ("line spacing", 5, 50, "m"),
+        ("buffer zone", 0, 20, "m"),
+    )
+)
+
+# Fixed error replies, shared by every handler that reports them
+_ERRORS = {
+    "THERMAL_UNAVAILABLE": "THERMAL_ERROR:Thermal camera not available",
+    "CAPTURE_THERMAL_UNAVAILABLE": "CAPTURE_ERROR:Thermal camera not available",
+    "METRICS_NO_MANAGER": "CAMERA_METRICS_ERROR:Camera manager not available",
+    "VIDEO_NO_MANAGER": "VIDEO_ERROR:Camera manager not available",
+    "VIDEO_ALREADY_RECORDING": "VIDEO_ERROR:Already recording",
+    "VIDEO_NOT_RECORDING": "VIDEO_ERROR:Not recording",
+    "VIDEO_UNKNOWN": "VIDEO_ERROR:Unknown command",
+    "GOTO_FORMAT": "GOTO_ERROR:Invalid format",
+    "GOTO_FAILED": "GOTO_ERROR:Failed to start goto command",
+    "GOTO_NO_DRONEKIT": "GOTO_ERROR:DroneKit not available",
+    "SURVEILLANCE_FORMAT": "SURVEILLANCE_ERROR:Invalid format",
+    "SURVEILLANCE_PARAMS": "SURVEILLANCE_ERROR:Invalid parameters format",
+    "SURVEILLANCE_STYLE": "SURVEILLANCE_ERROR:Invalid style",
+    "SURVEILLANCE_POINT": "SURVEILLANCE_ERROR:Invalid point format",
+    "SURVEILLANCE_TOO_FEW_POINTS": "SURVEILLANCE_ERROR:Need at least 3 points to define an area",
+    "SURVEILLANCE_FAILED": "SURVEILLANCE_ERROR:Failed to start mission",
+    "SURVEILLANCE_BUSY": "SURVEILLANCE_ERROR:A mission is already in progress",
+    "SURVEILLANCE_NO_DRONEKIT": "SURVEILLANCE_ERROR:DroneKit not available",
+}
+
+# Manual controls as (RC channel, PWM); a control's _STOP centers its channel
+_MANUAL_PWM = {
+    "THROTTLE_UP": (3, 1700),
+    "THROTTLE_DOWN": (3, 1300),
+    "YAW_LEFT": (4, 1300),
+    "YAW_RIGHT": (4, 1700),
+    "PITCH_FORWARD": (2, 1300),
+    "PITCH_BACKWARD": (2, 1700),
+    "ROLL_LEFT": (1, 1300),
+    "ROLL_RIGHT": (1, 1700),
+}
+_MANUAL_STOP = {"THROTTLE": 3, "YAW": 4, "PITCH": 2, "ROLL": 1}
+
+# Auto commands as DroneController methods, and relative moves in meters
+_AUTO_COMMANDS = {
+    "ARM": "arm",
+    "TAKEOFF": "takeoff",
+    "LAND": "land",
+    "RETURN_TO_LAUNCH": "return_to_launch",
+}
+_AUTO_MOVE = {
+    "FORWARD": (2, 0, 0),
+    "BACKWARD": (-2, 0, 0),
+    "LEFT": (0, -2, 0),
+    "RIGHT": (0, 2, 0),
+    "UP": (0, 0, 1),
+    "DOWN": (0, 0, -1),
+}
+
 class DataChannelManager:
     """Manages the WebRTC data channel for sending/receiving commands"""
     
+    __slots__ = (
+        "channel", "control_channel", "is_ready", "last_heartbeat_time",
+        "drone_controller", "camera_manager", "led_controller",
+        "_outbox", "_ctrl_outbox", "_flusher", "_last_sent_time",
+        "_loop", "_loop_thread", "_rx_queue", "_rx_worker", "_handler_tasks",
+        "_exact_commands", "_colon_commands", "_family_commands", "_offloaded",
+    )
+    
     def __init__(self, drone_controller=None, camera_manager=None, led_controller=None):
         self.channel = None
+        self.control_channel = None
         self.is_ready = False
-        self.last_heartbeat_time = time.time()
+        self.last_heartbeat_time = time.monotonic()
         self.drone_controller = drone_controller
         self.camera_manager = camera_manager
         self.led_controller = led_controller
+        self._outbox = []
+        self._ctrl_outbox = []
+        self._flusher = None
+        self._last_sent_time = 0.0
+        self._loop = None
+        self._loop_thread = None
+        self._rx_queue = None
+        self._rx_worker = None
+        self._handler_tasks = set()
+        
+        # Location updates are pushed by the drone controller from its own thread
+        if drone_controller is not None:
+            drone_controller.add_location_listener(self._on_location)
+        
+        # Command dispatch tables, see _find_handler and _rx_loop
+        self._exact_commands = {
+            "heartbeat": self._handle_heartbeat,
+            "CAPTURE_IMAGES": lambda msg: self._handle_capture_images(),
+            "CAMERA_METRICS": lambda msg: self._handle_camera_metrics(),
+        }
+        self._colon_commands = {
+            "MANUAL_PWM": self._handle_pwm_command,
+            "GOTO": self._handle_goto_command,
+            "START_SURVEILLANCE": self._handle_surveillance_command,
+        }
+        self._family_commands = {
+            "THERMAL": self._handle_thermal_command,
+            "VIDEO": self._handle_video_command,
+            "CAMERA": self._handle_camera_tilt,
+            "LED": self._handle_led_command,
+            "MANUAL": self._handle_flight_control,
+            "AUTO": self._handle_auto_command,
+        }
+        # Handlers that block on devices or the flight controller run in a
+        # worker thread so the event loop keeps streaming, without holding up
+        # the messages behind them. Those with a lock run one at a time, in
+        # order; AUTO has none so LAND or RETURN_TO_LAUNCH never wait behind
+        # an ARM. MANUAL stays inline so stick commands aren't delayed behind
+        # a thread hop
+        self._offloaded = {
+            self._exact_commands["CAPTURE_IMAGES"]: asyncio.Lock(),
+            self._colon_commands["GOTO"]: asyncio.Lock(),
+            self._colon_commands["START_SURVEILLANCE"]: asyncio.Lock(),
+            self._family_commands["VIDEO"]: asyncio.Lock(),
+            self._family_commands["AUTO"]: None,
+        }
     
     def set_channel(self, channel):
         """Set up the data channel and its event handlers"""
         self.channel = channel
+        self.control_channel = None
         self.is_ready = False
+        self._outbox.clear()
+        self._ctrl_outbox.clear()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        
+        # Messages are handled by a worker task so the receive path returns at once
+        self._stop_rx_worker()
+        rx_queue = asyncio.Queue(maxsize=RX_QUEUE_SIZE)
+        self._rx_queue = rx_queue
+        self._rx_worker = asyncio.ensure_future(self._rx_loop(rx_queue))
         
         @channel.on("open")
         def on_channel_open():
-            print("[Comm] Data channel is open.")
+            log.info("[Comm] Data channel is open.")
             self.is_ready = True
+            if self._flusher is None or self._flusher.done():
+                self._flusher = asyncio.ensure_future(self._flush_loop())
         
         @channel.on("message")
         def on_channel_message(msg):
-            self._process_message(msg)
+            try:
+                rx_queue.put_nowait(msg)
+            except asyncio.QueueFull:
+                log.warning("[Comm] Command queue full, dropping %s", msg)
         
         @channel.on("close")
         def on_channel_close():
-            print("[Comm] Data channel closed.")
+            log.info("[Comm] Data channel closed.")
             self.is_ready = False
+            self._outbox.clear()
     
-    def _process_message(self, msg):
-        """Process incoming messages from the data channel"""
-        # Handle heartbeat
-        if msg == "heartbeat":
-            print("[Comm] Heartbeat received.")
-            self.last_heartbeat_time = time.time()
-            self.channel.send("heartbeat")
-            return
-            
-        # Handle thermal camera commands
-        if msg.startswith("THERMAL_"):
-            self._handle_thermal_command(msg)
-            return
-            
-        # Handle image capture
-        if msg == "CAPTURE_IMAGES":
-            self._handle_capture_images()
-            return
-            
-        # Handle video recording commands
-        if msg.startswith("VIDEO_"):
-            self._handle_video_command(msg)
-            return
-            
-        # Handle PWM commands
-        if msg.startswith("MANUAL_PWM:"):
-            self._handle_pwm_command(msg)
-            return
-            
-        # Handle goto command
-        if msg.startswith("GOTO:"):
-            self._handle_goto_command(msg)
-            return
-
-        # Handle surveillance mission
-        if msg.startswith("START_SURVEILLANCE:"):
-            self._handle_surveillance_command(msg)
-            return
-
-        # Handle camera tilt
-        if msg.startswith("CAMERA_TILT_"):
-            self._handle_camera_tilt(msg)
+    def set_control_channel(self, channel):
+        """Set up the unreliable channel used for telemetry (after set_channel)"""
+        self.control_channel = channel
+        self._ctrl_outbox.clear()
+        rx_queue = self._rx_queue
+        
+        # The admin may send on either channel, handle both the same way
+        @channel.on("message")
+        def on_control_message(msg):
+            try:
+                rx_queue.put_nowait(msg)
+            except asyncio.QueueFull:
+                log.warning("[Comm] Command queue full, dropping %s", msg)
+        
+        @channel.on("close")
+        def on_control_close():
+            self._ctrl_outbox.clear()
+    
+    def _stop_rx_worker(self):
+        """Stop the worker of the previous channel once it has handled what it has"""
+        if self._rx_worker is not None and not self._rx_worker.done():
+            try:
+                self._rx_queue.put_nowait(None)
+            except asyncio.QueueFull:
+                self._rx_worker.cancel()
+        self._rx_worker = None
+    
+    async def _rx_loop(self, rx_queue):
+        """Handle incoming messages in order"""
+        while True:
+            msg = await rx_queue.get()
+            if msg is None:
+                break
+            handler = self._find_handler(msg)
+            if handler is None:
+                log.info("[Comm] Received from Admin => %s", msg)
+                continue
+            if handler in self._offloaded:
+                task = asyncio.ensure_future(self._run_offloaded(handler, msg))
+                self._handler_tasks.add(task)
+                task.add_done_callback(self._handler_tasks.discard)
+                continue
+            try:
+                handler(msg)
+            except Exception as e:
+                log.error("[Comm] Error handling %s: %s", msg, e)
+    
+    async def _run_offloaded(self, handler, msg):
+        """Run a blocking handler in a worker thread, after earlier ones sharing its lock"""
+        lock = self._offloaded[handler]
+        try:
+            if lock is None:
+                await asyncio.to_thread(handler, msg)
+            else:
+                async with lock:
+                    await asyncio.to_thread(handler, msg)
+        except Exception as e:
+            log.error("[Comm] Error handling %s: %s", msg, e)
+    
+    def _queue(self, msg):
+        """Queue a message for the next batched send (from any thread)"""
+        if not self.is_ready:
+            # No open channel, the message would only be cleared on reconnect
             return
-
-        # Handle LED commands
-        if msg.startswith("LED_"):
-            self._handle_led_command(msg)
+        if self._loop_thread is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._queue, msg)
             return
-
-        # Handle manual and auto flight control
-        if msg.startswith("MANUAL_") or msg.startswith("AUTO_"):
-            self._handle_flight_control(msg)
+        control = self.control_channel
+        if msg.startswith(_CONTROL_PREFIXES) and control is not None and control.readyState == "open":
+            outbox = self._ctrl_outbox
+        else:
+            outbox = self._outbox
+        # Newlines separate the messages in a batch
+        outbox.append(msg.replace("\n", " "))
+        if len(outbox) >= OUTBOX_FLUSH_SIZE:
+            self._flush()
+    
+    def _flush(self):
+        """Send the queued messages as newline-separated batches"""
+        if self._ctrl_outbox:
+            control = self.control_channel
+            if control is not None and control.bufferedAmount > OUTBOX_MAX_BUFFERED:
+                # Telemetry is superseded by the next update, drop it instead of piling up
+                self._ctrl_outbox.clear()
+            else:
+                self._send_batches(control, self._ctrl_outbox)
+        if self._outbox and self.channel and self.channel.bufferedAmount <= OUTBOX_MAX_BUFFERED:
+            self._send_batches(self.channel, self._outbox)
+    
+    def _send_batches(self, channel, outbox):
+        """Send and empty an outbox over an open channel"""
+        if channel is None or channel.readyState != "open":
             return
-            
-        # Default handler for unrecognized messages
-        print(f"[Comm] Received from Admin => {msg}")
+        send = channel.send
+        try:
+            while outbox:
+                batch = outbox[:OUTBOX_MAX_BATCH]
+                del outbox[:OUTBOX_MAX_BATCH]
+                send("\n".join(batch))
+            self._last_sent_time = time.monotonic()
+        except Exception as e:
+            log.error("[Comm] Error sending messages: %s", e)
+    
+    async def _flush_loop(self):
+        """Send whatever was queued since the last tick while the channel is open"""
+        while self.is_ready:
+            await asyncio.sleep(OUTBOX_INTERVAL)
+            self._flush()
+    
+    def _find_handler(self, msg):
+        """Return the handler for a message, or None if it isn't a known command"""
+        # Whole-message commands first, then "NAME:args" commands, then the
+        # command families matched on the text before the first underscore
+        handler = self._exact_commands.get(msg)
+        if handler is None:
+            head, sep, _ = msg.partition(":")
+            if sep:
+                handler = self._colon_commands.get(head)
+            if handler is None:
+                family, sep, _ = msg.partition("_")
+                if sep:
+                    handler = self._family_commands.get(family)
+        return handler
+    
+    def _handle_heartbeat(self, msg):
+        """Answer a heartbeat from the admin"""
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[Comm] Heartbeat received.")
+        self.last_heartbeat_time = time.monotonic()
+        # Every message we send shows the admin we're alive, so only echo the
+        # heartbeat when nothing else went out recently
+        if self.last_heartbeat_time - self._last_sent_time > HEARTBEAT_IDLE:
+            self._queue("heartbeat")
     
     def _handle_thermal_command(self, msg):
         """Handle thermal camera related commands"""
         if not self.camera_manager or not self.camera_manager.is_thermal_available():
-            self.channel.send("THERMAL_ERROR:Thermal camera not available")
+            self._queue(_ERRORS["THERMAL_UNAVAILABLE"])
             return
             
         thermal_camera = self.camera_manager.get_thermal_camera()
         if not thermal_camera:
-            self.channel.send("THERMAL_ERROR:Thermal camera not available")
+            self._queue(_ERRORS["THERMAL_UNAVAILABLE"])
             return
             
         try:
@@ -122,68 +390,68 @@ class DataChannelManager:
                 pass
                 
             elif msg.startswith("THERMAL_COLORMAP:"):
-                colormap_idx = int(msg.split(":")[1])
+                colormap_idx = int(msg.partition(":")[2])
                 thermal_camera.set_colormap(colormap_idx)
-                print(f"[Comm] Thermal colormap set to {colormap_idx}")
+                log.info("[Comm] Thermal colormap set to %s", colormap_idx)
                 
             elif msg.startswith("THERMAL_CONTRAST:"):
-                contrast = float(msg.split(":")[1])
+                contrast = float(msg.partition(":")[2])
                 thermal_camera.set_contrast(contrast)
-                print(f"[Comm] Thermal contrast set to {contrast}")
+                log.info("[Comm] Thermal contrast set to %s", contrast)
                 
             elif msg.startswith("THERMAL_BLUR:"):
-                blur = int(msg.split(":")[1])
+                blur = int(msg.partition(":")[2])
                 thermal_camera.set_blur(blur)
-                print(f"[Comm] Thermal blur set to {blur}")
+                log.info("[Comm] Thermal blur set to %s", blur)
                 
             elif msg.startswith("THERMAL_ROTATE:"):
-                angle = int(msg.split(":")[1])
+                angle = int(msg.partition(":")[2])
                 thermal_camera.set_rotation(angle)
-                print(f"[Comm] Thermal rotation set to {angle}")
+                log.info("[Comm] Thermal rotation set to %s", angle)
                 
             elif msg.startswith("THERMAL_THRESHOLD:"):
-                threshold = float(msg.split(":")[1])
+                threshold = float(msg.partition(":")[2])
                 thermal_camera.set_temp_threshold(threshold)
-                print(f"[Comm] Thermal threshold set to {threshold}")
+                log.info("[Comm] Thermal threshold set to %s", threshold)
                 
             elif msg.startswith("THERMAL_DETECT_REGIONS:"):
-                detect_value = msg.split(":")[1].lower()
+                detect_value = msg.partition(":")[2].lower()
                 detect_enabled = detect_value in ["true", "1", "on", "yes"]
                 thermal_camera.set_detect_regions(detect_enabled)
                 status = "enabled" if detect_enabled else "disabled"
-                print(f"[Comm] Thermal region detection {status}")
+                log.info("[Comm] Thermal region detection %s", status)
                 # Send confirmation back to client
-                self.channel.send(f"THERMAL_DETECT_REGIONS_STATUS:{status}")
+                self._queue(f"THERMAL_DETECT_REGIONS_STATUS:{status}")
                 
             elif msg.startswith("THERMAL_DETECTION_MODE:"):
-                mode = msg.split(":")[1].lower()
+                mode = msg.partition(":")[2].lower()
                 if mode in ["over", "under"]:
                     thermal_camera.set_detection_mode(mode)
-                    print(f"[Comm] Thermal detection mode set to {mode}")
+                    log.info("[Comm] Thermal detection mode set to %s", mode)
                     # Send confirmation back to client
-                    self.channel.send(f"THERMAL_DETECTION_MODE_STATUS:{mode}")
+                    self._queue(f"THERMAL_DETECTION_MODE_STATUS:{mode}")
             
             elif msg == "THERMAL_TOGGLE_HUD":
                 # Toggle the HUD display
                 if hasattr(thermal_camera, 'toggle_hud'):
                     thermal_camera.toggle_hud()
                     hud_status = "ON" if thermal_camera.show_hud else "OFF"
-                    print(f"[Comm] Thermal HUD display: {hud_status}")
+                    log.info("[Comm] Thermal HUD display: %s", hud_status)
                     # Send confirmation back to client
-                    self.channel.send(f"THERMAL_HUD_STATUS:{hud_status}")
+                    self._queue(f"THERMAL_HUD_STATUS:{hud_status}")
                     
         except Exception as e:
-            print(f"[Comm] Error processing thermal command {msg}: {e}")
-            self.channel.send(f"THERMAL_ERROR:{str(e)}")
+            log.error("[Comm] Error processing thermal command %s: %s", msg, e)
+            self._queue(f"THERMAL_ERROR:{str(e)}")
     
     def _handle_capture_images(self):
         """Handle image capture command"""
-        print("[Comm] CAPTURE_IMAGES command received")
+        log.info("[Comm] CAPTURE_IMAGES command received")
         
         try:
             if not self.camera_manager or not self.camera_manager.is_thermal_available():
-                print("[Comm] Thermal camera not available for capture")
-                self.channel.send("CAPTURE_ERROR:Thermal camera not available")
+                log.warning("[Comm] Thermal camera not available for capture")
+                self._queue(_ERRORS["CAPTURE_THERMAL_UNAVAILABLE"])
                 return
                 
             thermal_camera = self.camera_manager.get_thermal_camera()
@@ -197,31 +465,37 @@ class DataChannelManager:
             result = thermal_camera.capture_images(normal_frame)
             
             if "error" in result:
-                print(f"[Comm] Capture error: {result['error']}")
-                self.channel.send(f"CAPTURE_ERROR:{result['error']}")
+                log.error("[Comm] Capture error: %s", result['error'])
+                self._queue(f"CAPTURE_ERROR:{result['error']}")
             else:
-                print(f"[Comm] Images captured successfully to {result['thermal_path']}")
-                self.channel.send(f"CAPTURE_SUCCESS:{result['timestamp']}")
+                log.info("[Comm] Images captured successfully to %s", result['thermal_path'])
+                self._queue(f"CAPTURE_SUCCESS:{result['timestamp']}")
                 
         except Exception as e:
-            print(f"[Comm] Error during capture: {e}")
-            import traceback
+            log.error("[Comm] Error during capture: %s", e)
             traceback.print_exc()
-            self.channel.send(f"CAPTURE_ERROR:{str(e)}")
+            self._queue(f"CAPTURE_ERROR:{str(e)}")
+
+    def _handle_camera_metrics(self):
+        """Send the camera capture counters as JSON"""
+        if not self.camera_manager:
+            self._queue(_ERRORS["METRICS_NO_MANAGER"])
+            return
+        self._queue(f"CAMERA_METRICS:{_dumps(self.camera_manager.get_metrics())}")
 
     def _handle_video_command(self, msg):
         """Handle video recording commands"""
         if not self.camera_manager:
-            print("[Comm] Camera manager not available for video recording")
-            self.channel.send("VIDEO_ERROR:Camera manager not available")
+            log.warning("[Comm] Camera manager not available for video recording")
+            self._queue(_ERRORS["VIDEO_NO_MANAGER"])
             return
             
         try:
             if msg.startswith("VIDEO_START"):
                 # Check if we're already recording
                 if self.camera_manager.is_recording():
-                    print("[Comm] Already recording video")
-                    self.channel.send("VIDEO_ERROR:Already recording")
+                    log.warning("[Comm] Already recording video")
+                    self._queue(_ERRORS["VIDEO_ALREADY_RECORDING"])
                     return
                     
                 # Parse thermal data FPS if provided (default to 1)
@@ -234,135 +508,130 @@ class DataChannelManager:
                             # Ensure a reasonable value (0.1 to 30 FPS)
                             thermal_data_fps = max(0.1, min(30, thermal_data_fps))
                         except ValueError:
-                            print(f"[Comm] Invalid thermal data FPS value: {parts[1]}, using default 1 FPS")
+                            log.warning("[Comm] Invalid thermal data FPS value: %s, using default 1 FPS", parts[1])
                 
-                print(f"[Comm] Starting video recording with thermal data at {thermal_data_fps} FPS")
+                log.info("[Comm] Starting video recording with thermal data at %s FPS", thermal_data_fps)
                 result = self.camera_manager.start_video_recording(thermal_data_fps)
                 
                 if "error" in result:
-                    self.channel.send(f"VIDEO_ERROR:{result['error']}")
+                    self._queue(f"VIDEO_ERROR:{result['error']}")
                 else:
-                    self.channel.send(f"VIDEO_STARTED:{result['timestamp']}:{result['thermal_data_fps']}")
+                    self._queue(f"VIDEO_STARTED:{result['timestamp']}:{result['thermal_data_fps']}")
                     
             elif msg == "VIDEO_STOP":
                 if not self.camera_manager.is_recording():
-                    print("[Comm] Not recording video")
-                    self.channel.send("VIDEO_ERROR:Not recording")
+                    log.warning("[Comm] Not recording video")
+                    self._queue(_ERRORS["VIDEO_NOT_RECORDING"])
                     return
                     
-                print("[Comm] Stopping video recording")
+                log.info("[Comm] Stopping video recording")
                 result = self.camera_manager.stop_video_recording()
                 
                 if "error" in result:
-                    self.channel.send(f"VIDEO_ERROR:{result['error']}")
+                    self._queue(f"VIDEO_ERROR:{result['error']}")
                 else:
                     # Send success with timestamp and frames recorded info
                     frames_info = result['frames_recorded']
                     response = (f"VIDEO_STOPPED:{result['timestamp']}:" +
                                f"{frames_info['normal']}:{frames_info['thermal']}:{frames_info['thermal_data']}")
-                    self.channel.send(response)
+                    self._queue(response)
                     
             else:
-                print(f"[Comm] Unknown video command: {msg}")
-                self.channel.send("VIDEO_ERROR:Unknown command")
+                log.warning("[Comm] Unknown video command: %s", msg)
+                self._queue(_ERRORS["VIDEO_UNKNOWN"])
                 
         except Exception as e:
-            print(f"[Comm] Error handling video command: {e}")
-            import traceback
+            log.error("[Comm] Error handling video command: %s", e)
             traceback.print_exc()
-            self.channel.send(f"VIDEO_ERROR:{str(e)}")
+            self._queue(f"VIDEO_ERROR:{str(e)}")
     
     def _handle_pwm_command(self, msg):
         """Handle PWM commands for RC channels"""
+        set_rc = self.drone_controller.set_rc_channel if self.drone_controller else None
         try:
             # Format: MANUAL_PWM:channel:pwm_value
-            parts = msg.split(":")
-            if len(parts) == 3:
-                channel_num = int(parts[1])
+            _, _, rest = msg.partition(":")
+            channel_s, sep, pwm_s = rest.partition(":")
+            if sep and ":" not in pwm_s:
+                channel_num = int(channel_s)
                 # Handle both integer and floating point values
                 try:
                     # First try converting to integer directly
-                    pwm_value = int(parts[2])
+                    pwm_value = int(pwm_s)
                 except ValueError:
                     # If that fails, try converting to float first, then to integer
                     try:
-                        pwm_value = int(float(parts[2]))
+                        pwm_value = int(float(pwm_s))
                     except ValueError:
-                        print(f"[Comm] Invalid PWM value: {parts[2]}")
+                        log.warning("[Comm] Invalid PWM value: %s", pwm_s)
                         return
                 
                 # Set the channel to the specified PWM value
-                if self.drone_controller:
-                    self.drone_controller.set_rc_channel(channel_num, pwm_value)
+                if set_rc is not None:
+                    set_rc(channel_num, pwm_value)
             else:
-                print(f"[Comm] Invalid PWM format: {msg}")
+                log.warning("[Comm] Invalid PWM format: %s", msg)
         except Exception as e:
-            print(f"[Comm] Error processing PWM command: {e}")
+            log.error("[Comm] Error processing PWM command: %s", e)
     
     def _handle_goto_command(self, msg):
         """Handle goto command for drone navigation"""
         try:
             # Format: GOTO:lat:lon:alt
-            parts = msg.split(":")
-            if len(parts) == 4:
-                lat = float(parts[1])
-                lon = float(parts[2])
-                alt = float(parts[3])
+            _, _, rest = msg.partition(":")
+            lat_s, _, rest = rest.partition(":")
+            lon_s, sep, alt_s = rest.partition(":")
+            if sep and ":" not in alt_s:
+                lat = float(lat_s)
+                lon = float(lon_s)
+                alt = float(alt_s)
 
                 if self.drone_controller and self.drone_controller.is_available:
-                    print(f"[Comm] Received goto command: Lat {lat}, Lon {lon}, Alt {alt}")
+                    log.info("[Comm] Received goto command: Lat %s, Lon %s, Alt %s", lat, lon, alt)
                     # Execute the goto command through the drone controller
                     success = self.drone_controller.goto(lat, lon, alt)
 
                     if success:
                         # Send confirmation back to client
-                        self.channel.send(f"GOTO_STARTED:{lat}:{lon}:{alt}")
+                        self._queue(f"GOTO_STARTED:{lat}:{lon}:{alt}")
                     else:
-                        self.channel.send("GOTO_ERROR:Failed to start goto command")
+                        self._queue(_ERRORS["GOTO_FAILED"])
                 else:
-                    print("[Comm] DroneKit not available, cannot goto")
-                    self.channel.send("GOTO_ERROR:DroneKit not available")
+                    log.warning("[Comm] DroneKit not available, cannot goto")
+                    self._queue(_ERRORS["GOTO_NO_DRONEKIT"])
             else:
-                print(f"[Comm] Invalid goto format: {msg}")
-                self.channel.send("GOTO_ERROR:Invalid format")
+                log.warning("[Comm] Invalid goto format: %s", msg)
+                self._queue(_ERRORS["GOTO_FORMAT"])
         except Exception as e:
-            print(f"[Comm] Error processing goto: {e}")
-            self.channel.send(f"GOTO_ERROR:{str(e)}")
+            log.error("[Comm] Error processing goto: %s", e)
+            self._queue(f"GOTO_ERROR:{str(e)}")
 
     def _handle_surveillance_command(self, msg):
         """Handle surveillance mission command"""
         try:
             # Format: START_SURVEILLANCE:lat1:lon1,lat2:lon2,...|speed:altitude:style:lineSpacing:bufferZone
             # Remove command prefix
-            content = msg.replace("START_SURVEILLANCE:", "")
+            content = msg[_SURVEILLANCE_PREFIX_LEN:]
 
             # Split into area points and mission parameters
-            parts = content.split("|")
-            if len(parts) != 2:
-                print(f"[Comm] Invalid surveillance format: {msg}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid format")
+            points_str, sep, params_str = content.partition("|")
+            if not sep or "|" in params_str:
+                log.warning("[Comm] Invalid surveillance format: %s", msg)
+                self._queue(_ERRORS["SURVEILLANCE_FORMAT"])
                 return
 
-            points_str, params_str = parts
-
-            # Parse area points
-            points_list = []
-            for point in points_str.split(","):
-                coords = point.split(":")
-                if len(coords) != 2:
-                    print(f"[Comm] Invalid point format: {point}")
-                    self.channel.send("SURVEILLANCE_ERROR:Invalid point format")
-                    return
-
-                lat = float(coords[0])
-                lon = float(coords[1])
-                points_list.append((lat, lon))
+            # Parse area points in one pass once the whole list is known to be well formed
+            if not _POINTS_RE.fullmatch(points_str):
+                log.warning("[Comm] Invalid point format: %s", points_str)
+                self._queue(_ERRORS["SURVEILLANCE_POINT"])
+                return
+            points_list = [(float(lat), float(lon)) for lat, lon in _POINT_RE.findall(points_str)]
 
             # Parse mission parameters
-            params = params_str.split(":")
-            if len(params) != 5:
-                print(f"[Comm] Invalid parameters format: {params_str}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid parameters format")
+            params = params_str.split(":", 4)
+            if len(params) != 5 or ":" in params[4]:
+                log.warning("[Comm] Invalid parameters format: %s", params_str)
+                self._queue(_ERRORS["SURVEILLANCE_PARAMS"])
                 return
 
             speed = float(params[0])
@@ -372,40 +641,31 @@ class DataChannelManager:
             buffer_zone = float(params[4])
 
             # Validate parameters
-            if speed < 1 or speed > 15:
-                print(f"[Comm] Invalid speed: {speed}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid speed (1-15 m/s)")
-                return
-
-            if altitude < 10 or altitude > 120:
-                print(f"[Comm] Invalid altitude: {altitude}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid altitude (10-120 m)")
-                return
+            values = (speed, altitude, line_spacing, buffer_zone)
+            for (name, low, high, error), value in zip(_SURVEILLANCE_LIMITS, values):
+                if not low <= value <= high:
+                    log.warning("[Comm] Invalid %s: %s", name, value)
+                    self._queue(error)
+                    return
 
             if style not in ["longest", "shortest"]:
-                print(f"[Comm] Invalid style: {style}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid style")
-                return
-
-            if line_spacing < 5 or line_spacing > 50:
-                print(f"[Comm] Invalid line spacing: {line_spacing}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid line spacing (5-50 m)")
-                return
-
-            if buffer_zone < 0 or buffer_zone > 20:
-                print(f"[Comm] Invalid buffer zone: {buffer_zone}")
-                self.channel.send("SURVEILLANCE_ERROR:Invalid buffer zone (0-20 m)")
+                log.warning("[Comm] Invalid style: %s", style)
+                self._queue(_ERRORS["SURVEILLANCE_STYLE"])
                 return
 
             # Check if we have at least 3 points to define an area
             if len(points_list) < 3:
-                print(f"[Comm] Not enough points for surveillance area: {len(points_list)}")
-                self.channel.send("SURVEILLANCE_ERROR:Need at least 3 points to define an area")
+                log.info("[Comm] Not enough points for surveillance area: %s", len(points_list))
+                self._queue(_ERRORS["SURVEILLANCE_TOO_FEW_POINTS"])
                 return
 
             # Execute the surveillance mission
             if self.drone_controller and self.drone_controller.is_available:
-                print(f"[Comm] Starting surveillance mission with {len(points_list)} points")
+                if self.drone_controller.is_mission_in_progress():
+                    log.warning("[Comm] Surveillance mission already in progress, ignoring new one")
+                    self._queue(_ERRORS["SURVEILLANCE_BUSY"])
+                    return
+                log.info("[Comm] Starting surveillance mission with %s points", len(points_list))
 
                 # Start the surveillance mission
                 success = self.drone_controller.start_surveillance_mission(
@@ -414,170 +674,184 @@ class DataChannelManager:
 
                 if success:
                     # Send confirmation back to client
-                    self.channel.send(f"SURVEILLANCE_STARTED:{len(points_list)}")
+                    self._queue(f"SURVEILLANCE_STARTED:{len(points_list)}")
                 else:
-                    self.channel.send("SURVEILLANCE_ERROR:Failed to start mission")
+                    self._queue(_ERRORS["SURVEILLANCE_FAILED"])
             else:
-                print("[Comm] DroneKit not available, cannot start surveillance")
-                self.channel.send("SURVEILLANCE_ERROR:DroneKit not available")
+                log.warning("[Comm] DroneKit not available, cannot start surveillance")
+                self._queue(_ERRORS["SURVEILLANCE_NO_DRONEKIT"])
 
         except Exception as e:
-            print(f"[Comm] Error processing surveillance command: {e}")
-            import traceback
+            log.error("[Comm] Error processing surveillance command: %s", e)
             traceback.print_exc()
-            self.channel.send(f"SURVEILLANCE_ERROR:{str(e)}")
+            self._queue(f"SURVEILLANCE_ERROR:{str(e)}")
     
     def _handle_camera_tilt(self, msg):
         """Handle camera tilt commands"""
         if msg == "CAMERA_TILT_UP":
-            print("[Comm] Tilting camera UP")
+            log.info("[Comm] Tilting camera UP")
             if self.drone_controller:
                 self.drone_controller.control_camera_tilt("up")
         
         elif msg == "CAMERA_TILT_DOWN":
-            print("[Comm] Tilting camera DOWN")
+            log.info("[Comm] Tilting camera DOWN")
             if self.drone_controller:
                 self.drone_controller.control_camera_tilt("down")
+        
+        else:
+            log.info("[Comm] Received from Admin => %s", msg)
     
     def _handle_led_command(self, msg):
         """Handle LED control commands"""
-        import re
-        
-        if msg.startswith("LED_SET_COLOR:"):
+        if msg.startswith(_LED_PREFIX):
             # Extract RGB values from command (format: LED_SET_COLOR:R,G,B)
             try:
-                rgb_match = re.match(r"LED_SET_COLOR:(\d+),(\d+),(\d+)", msg)
-                if rgb_match and self.led_controller:
-                    r, g, b = map(int, rgb_match.groups())
-                    self.led_controller.set_color(r, g, b)
-                else:
-                    print(f"[Comm] Invalid LED color format: {msg}")
-            except Exception as e:
-                print(f"[Comm] Error parsing LED command: {e}")
-                import traceback
-                traceback.print_exc()
+                r, g, b = map(int, msg[_LED_PREFIX_LEN:].split(",", 2))
+            except ValueError:
+                log.warning("[Comm] Invalid LED color format: %s", msg)
+                return
+            if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+                log.warning("[Comm] Invalid LED color format: %s", msg)
+            elif self.led_controller:
+                self.led_controller.set_color(r, g, b)
         
         elif msg == "LED_OFF" and self.led_controller:
-            print("[Comm] Turning off LEDs")
+            log.info("[Comm] Turning off LEDs")
             self.led_controller.set_color(0, 0, 0)
     
     def _handle_flight_control(self, msg):
-        """Handle manual and auto flight control commands"""
+        """Handle manual flight control commands"""
         if not self.drone_controller:
             return
+        set_rc = self.drone_controller.set_rc_channel
             
         if msg.endswith("_STOP"):
-            action = msg.replace("_STOP", "")
-            print(f"[Comm] Control STOPPED: {action}")
+            action = msg[:-len("_STOP")]
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("[Comm] Control STOPPED: %s", action)
             
-            # Handle control stops
-            if action.startswith("MANUAL_THROTTLE"):
-                self.drone_controller.set_rc_channel(3, 1500)  # Center throttle
-            elif action.startswith("MANUAL_YAW"):
-                self.drone_controller.set_rc_channel(4, 1500)  # Center yaw
-            elif action.startswith("MANUAL_PITCH"):
-                self.drone_controller.set_rc_channel(2, 1500)  # Center pitch
-            elif action.startswith("MANUAL_ROLL"):
-                self.drone_controller.set_rc_channel(1, 1500)  # Center roll
+            # Center the stick the stopped manual control was moving
+            channel = _MANUAL_STOP.get(action.partition("_")[2].partition("_")[0])
+            if channel is not None:
+                set_rc(channel, 1500)
+            return
+            
+        action = msg.partition("_")[2]
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[Comm] Manual control activated: %s", action)
+        pwm = _MANUAL_PWM.get(action)
+        if pwm is not None:
+            set_rc(*pwm)
+    
+    def _handle_auto_command(self, msg):
+        """Handle auto flight commands (runs in a worker thread, arming and takeoff wait on the vehicle)"""
+        if not self.drone_controller:
+            return
+            
+        if msg.endswith("_STOP"):
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("[Comm] Control STOPPED: %s", msg[:-len("_STOP")])
+            return
+            
+        action = msg.partition("_")[2]
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[Comm] Auto command activated: %s", action)
+        command = _AUTO_COMMANDS.get(action)
+        if command is not None:
+            getattr(self.drone_controller, command)()
         else:
-            # Parse the command for better display
-            if msg.startswith("MANUAL_"):
-                command_type = "MANUAL"
-                action = msg.replace("MANUAL_", "")
-                print(f"[Comm] Manual control activated: {action}")
-                
-                # Handle specific manual controls
-                if "THROTTLE_UP" in msg:
-                    self.drone_controller.set_rc_channel(3, 1700)  # Throttle up
-                elif "THROTTLE_DOWN" in msg:
-                    self.drone_controller.set_rc_channel(3, 1300)  # Throttle down
-                elif "YAW_LEFT" in msg:
-                    self.drone_controller.set_rc_channel(4, 1300)  # Yaw left
-                elif "YAW_RIGHT" in msg:
-                    self.drone_controller.set_rc_channel(4, 1700)  # Yaw right
-                elif "PITCH_FORWARD" in msg:
-                    self.drone_controller.set_rc_channel(2, 1300)  # Pitch forward
-                elif "PITCH_BACKWARD" in msg:
-                    self.drone_controller.set_rc_channel(2, 1700)  # Pitch backward
-                elif "ROLL_LEFT" in msg:
-                    self.drone_controller.set_rc_channel(1, 1300)  # Roll left
-                elif "ROLL_RIGHT" in msg:
-                    self.drone_controller.set_rc_channel(1, 1700)  # Roll right
-                    
-            elif msg.startswith("AUTO_"):
-                command_type = "AUTO"
-                action = msg.replace("AUTO_", "")
-                print(f"[Comm] Auto command activated: {action}")
-                
-                # Handle specific auto commands
-                if "ARM" in msg:
-                    self.drone_controller.arm()
-                elif "TAKEOFF" in msg:
-                    self.drone_controller.takeoff()
-                elif "LAND" in msg:
-                    self.drone_controller.land()
-                elif "RETURN_TO_LAUNCH" in msg:
-                    self.drone_controller.return_to_launch()
-                # Handle directional auto controls
-                elif "FORWARD" in msg:
-                    self.drone_controller.move_relative(2, 0, 0)  # Move 2m forward
-                elif "BACKWARD" in msg:
-                    self.drone_controller.move_relative(-2, 0, 0)  # Move 2m backward
-                elif "LEFT" in msg:
-                    self.drone_controller.move_relative(0, -2, 0)  # Move 2m left
-                elif "RIGHT" in msg:
-                    self.drone_controller.move_relative(0, 2, 0)  # Move 2m right
-                elif "UP" in msg:
-                    self.drone_controller.move_relative(0, 0, 1)  # Move 1m up
-                elif "DOWN" in msg:
-                    self.drone_controller.move_relative(0, 0, -1)  # Move 1m down
+            # Directional auto controls
+            move = _AUTO_MOVE.get(action)
+            if move is not None:
+                self.drone_controller.move_relative(*move)
+    
+    def _on_location(self, location):
+        """Queue a location update (called from the drone controller's thread)"""
+        loop = self._loop
+        if loop is None or not self.is_ready:
+            return
+        try:
+            msg = _LOC_FMT % (location['lat'], location['lon'], location['rel_alt'], location['alt'])
+        except TypeError:
+            # No GPS fix yet, some fields are still None
+            return
+        try:
+            self._queue(msg)
+        except RuntimeError:
+            # The event loop has already been closed
+            pass
     
     async def monitor_heartbeat(self):
-        """Periodically monitor heartbeat and send location updates"""
+        """Periodically check that the admin's heartbeats are still arriving"""
         while True:
             await asyncio.sleep(3)
             if self.channel and self.is_ready:
-                if time.time() - self.last_heartbeat_time > 7:
-                    print("[Comm] No heartbeat received for 7 seconds")
+                now = time.monotonic()
+                if now - self.last_heartbeat_time > 7:
+                    log.warning("[Comm] No heartbeat received for 7 seconds")
                     # Consider implementing a safety feature like RTL here
-                
-                # Send current location periodically if connected to vehicle
-                if self.drone_controller and self.drone_controller.is_available:
-                    try:
-                        location = self.drone_controller.get_location()
-                        if location:
-                            self.channel.send(
-                                f"LOCATION:{location['lat']}:{location['lon']}:{location['rel_alt']}:{location['alt']}"
-                            )
-                    except Exception as e:
-                        print(f"[Comm] Error sending location: {e}")
 
 class VideoStreamTrackFactory:
     """Factory for creating video stream tracks for WebRTC"""
     
+    __slots__ = ()
+    
     @staticmethod
     def create_normal_camera_track(camera_manager):
         """Create a video track for the regular camera"""
-        from camera_manager import GlobalCameraStreamTrack
+        if GlobalCameraStreamTrack is None:
+            return None
         
         camera = camera_manager.get_camera()
         if camera:
-            return GlobalCameraStreamTrack(camera)
+            return GlobalCameraStreamTrack(camera_manager)
         return None
     
     @staticmethod
     def create_thermal_camera_track(camera_manager):
         """Create a video track for the thermal camera"""
-        from camera_manager import ThermalCameraStreamTrack
+        if ThermalCameraStreamTrack is None:
+            return None
         
         thermal_camera = camera_manager.get_thermal_camera()
         if thermal_camera:
             return ThermalCameraStreamTrack(thermal_camera)
         return None
 
+# Configure STUN/TURN servers for WebRTC using ExpressTURN
+_ICE_SERVERS = [
+    # STUN server - likely still works with this standard STUN endpoint
+    RTCIceServer(urls=["stun:stun.expressturn.com:3478"]),
+    # TURN server - using your assigned relay server
+    RTCIceServer(
+        urls=[
+            # UDP options
+            "turn:relay1.expressturn.com:3480?transport=udp",
+            # TCP options for firewall traversal
+            "turn:relay1.expressturn.com:3480?transport=tcp",
+            "turn:relay1.expressturn.com:80?transport=tcp",
+            # Secure options
+            "turns:relay1.expressturn.com:443?transport=tcp",
+            "turns:relay1.expressturn.com:5349?transport=tcp",
+        ],
+        username="174686931792636027",  # Replace with your ExpressTURN username
+        credential="+Kc1neP2q0un1Z2OTMxU6JDKcv0=",  # Replace with your ExpressTURN password
+    ),
+]
+
+_RTC_CONFIG = RTCConfiguration(iceServers=_ICE_SERVERS)
+
+# Send/receive buffer for the signaling websocket, in bytes
+SIGNALING_SOCKET_BUFFER = 262144
+
 class CommunicationManager:
     """Manages WebRTC communication with remote clients"""
     
+    __slots__ = (
+        "camera_manager", "drone_controller", "led_controller",
+        "sio", "channel_manager", "ice_servers", "rtc_config", "pc",
+    )
+    
     def __init__(self, camera_manager=None, drone_controller=None, led_controller=None):
         self.camera_manager = camera_manager
         self.drone_controller = drone_controller
@@ -593,31 +867,9 @@ class CommunicationManager:
             led_controller=led_controller
         )
         
-        # Configure STUN/TURN servers for WebRTC using ExpressTURN
-       # In the CommunicationManager.__init__ method, update the ice_servers configuration:
-
-        # Configure STUN/TURN servers for WebRTC using ExpressTURN
-        self.ice_servers = [
-            # STUN server - likely still works with this standard STUN endpoint
-            RTCIceServer(urls=["stun:stun.expressturn.com:3478"]),
-            # TURN server - using your assigned relay server
-            RTCIceServer(
-                urls=[
-                    # UDP options
-                    "turn:relay1.expressturn.com:3480?transport=udp",
-                    # TCP options for firewall traversal
-                    "turn:relay1.expressturn.com:3480?transport=tcp",
-                    "turn:relay1.expressturn.com:80?transport=tcp",
-                    # Secure options
-                    "turns:relay1.expressturn.com:443?transport=tcp",
-                    "turns:relay1.expressturn.com:5349?transport=tcp",
-                ],
-                username="174686931792636027",  # Replace with your ExpressTURN username
-                credential="+Kc1neP2q0un1Z2OTMxU6JDKcv0=",  # Replace with your ExpressTURN password
-            ),
-        ]
-        
-        self.rtc_config = RTCConfiguration(iceServers=self.ice_servers)
+        # STUN/TURN configuration is shared by every peer connection
+        self.ice_servers = _ICE_SERVERS
+        self.rtc_config = _RTC_CONFIG
         self.pc = None
         
         # Set up Socket.IO event handlers
@@ -627,13 +879,14 @@ class CommunicationManager:
         """Set up handlers for Socket.IO events"""
         @self.sio.event
         async def connect():
-            print("[Comm] Connected to signaling server.")
+            log.info("[Comm] Connected to signaling server.")
+            self._tune_signaling_socket()
             await self.create_and_send_offer()
             asyncio.create_task(self.channel_manager.monitor_heartbeat())
         
         @self.sio.event
         async def disconnect():
-            print("[Comm] Disconnected from signaling server.")
+            log.info("[Comm] Disconnected from signaling server.")
         
         @self.sio.on("answer")
         async def on_answer(data):
@@ -649,37 +902,43 @@ class CommunicationManager:
     async def create_and_send_offer(self):
         """Create and send a WebRTC offer to the signaling server"""
         if self.pc and self.pc.connectionState not in ["closed", "failed", "disconnected"]:
-            print("[Comm] Closing existing peer connection before re-init.")
+            log.info("[Comm] Closing existing peer connection before re-init.")
             await self.pc.close()
         
         self.pc = RTCPeerConnection(configuration=self.rtc_config)
+        # Telemetry goes over an unordered channel without retransmits so a
+        # lost update never holds up the next one. The admin sends its
+        # commands on "chat" by label (see useWebRTC.js), whatever order the
+        # channels are announced in.
+        ctrl = self.pc.createDataChannel("ctrl", ordered=False, maxRetransmits=0)
         dc = self.pc.createDataChannel("chat")
         self.channel_manager.set_channel(dc)
+        self.channel_manager.set_control_channel(ctrl)
         
         # Add regular camera track
         if self.camera_manager and self.camera_manager.is_camera_available():
-            print("[Comm] Adding regular camera track to peer connection")
+            log.info("[Comm] Adding regular camera track to peer connection")
             video_track = VideoStreamTrackFactory.create_normal_camera_track(self.camera_manager)
             if video_track:
                 video_track.set_data_channel(self.channel_manager)
                 self.pc.addTrack(video_track)
             else:
-                print("[Comm] WARNING: Could not create regular camera track")
+                log.warning("[Comm] WARNING: Could not create regular camera track")
         
         # Add thermal camera track if available
         try:
             if self.camera_manager and self.camera_manager.is_thermal_available():
-                print("[Comm] Adding thermal camera track to peer connection")
+                log.info("[Comm] Adding thermal camera track to peer connection")
                 thermal_track = VideoStreamTrackFactory.create_thermal_camera_track(self.camera_manager)
                 if thermal_track:
                     thermal_track.set_data_channel(self.channel_manager)
                     self.pc.addTrack(thermal_track)
                 else:
-                    print("[Comm] Could not create thermal camera track")
+                    log.warning("[Comm] Could not create thermal camera track")
             else:
-                print("[Comm] Thermal camera not available, skipping thermal track")
+                log.warning("[Comm] Thermal camera not available, skipping thermal track")
         except Exception as e:
-            print(f"[Comm] Error adding thermal track: {e}")
+            log.error("[Comm] Error adding thermal track: %s", e)
             # Don't let thermal camera issues break the main video stream
         
         offer = await self.pc.createOffer()
@@ -689,13 +948,30 @@ class CommunicationManager:
     async def connect_to_server(self, server_url):
         """Connect to the signaling server"""
         try:
-            await self.sio.connect(server_url)
-            print(f"[Comm] Connected to signaling server at {server_url}")
+            # Straight to the websocket transport: signaling messages skip the
+            # long-polling round trips, and its socket exists by the time the
+            # connect handler tunes it
+            await self.sio.connect(server_url, transports=["websocket"])
+            log.info("[Comm] Connected to signaling server at %s", server_url)
             return True
         except Exception as e:
-            print(f"[Comm] Failed to connect to signaling server: {e}")
+            log.warning("[Comm] Failed to connect to signaling server: %s", e)
             return False
     
+    def _tune_signaling_socket(self):
+        """Size the buffers on the signaling websocket (aiohttp already disables Nagle)"""
+        ws = getattr(self.sio.eio, "ws", None)
+        get_extra_info = getattr(ws, "get_extra_info", None)
+        sock = get_extra_info("socket") if get_extra_info is not None else None
+        if sock is None:
+            log.info("[Comm] No signaling websocket to tune, leaving socket buffers as they are")
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SIGNALING_SOCKET_BUFFER)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SIGNALING_SOCKET_BUFFER)
+        except OSError as e:
+            log.warning("[Comm] Could not tune signaling socket: %s", e)
+    
     async def disconnect(self):
         """Disconnect from the signaling server and clean up resources"""
         if self.pc:
@@ -705,4 +981,4 @@ class CommunicationManager:
         if self.sio.connected:
             await self.sio.disconnect()
         
-        print("[Comm] Disconnected from signaling server")
\ No newline at end of file
+        log.info("[Comm] Disconnected from signaling server")
\ No newline at end of file
@@ -9,17 +9,143 @@ Interfaces with the Pixhawk flight controller via DroneKit
 import time
 import threading
 import math
+import logging
+import traceback
+import queue
 import numpy as np
 from collections import deque
+from functools import lru_cache
+
+log = logging.getLogger("drone")
 
 # Import drone control libraries
 try:
-    from dronekit import connect, VehicleMode, LocationGlobalRelative
+    from dronekit import connect, VehicleMode, LocationGlobalRelative, Command
     from pymavlink import mavutil
     DRONE_KIT_AVAILABLE = True
 except ImportError as e:
     DRONE_KIT_AVAILABLE = False
-    print(f"[Drone] DroneKit not available: {e}. Flight controls won't work.")
+    log.warning("[Drone] DroneKit not available: %s. Flight controls won't work.", e)
+
+# Optional convex hull for the surveillance bounding box, see _convex_hull
+try:
+    from scipy.spatial import ConvexHull
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Optional JIT compiler for the batch distance kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Meters per degree of latitude (approximately constant)
+METERS_PER_LAT = 111320.0
+
+# Acceptance radius of uploaded surveillance waypoints, in meters
+WAYPOINT_ACCURACY = 5.0
+
+# An AUTO mission is given up on after MISSION_TIME_FACTOR times its flying
+# time at the requested speed plus MISSION_TIME_SLACK seconds (reaching the
+# first waypoint, turns), in case its last MISSION_ITEM_REACHED is lost
+MISSION_TIME_FACTOR = 1.5
+MISSION_TIME_SLACK = 120.0
+
+# Upper bound on the waypoints of one surveillance path, about what the
+# autopilot can hold as a mission
+MAX_SURVEILLANCE_WAYPOINTS = 700
+
+# Shortest time between two location updates pushed to listeners, in seconds
+LOCATION_UPDATE_INTERVAL = 1.0
+
+@lru_cache(maxsize=4096)
+def _meters_per_lon_q(lat_q):
+    return METERS_PER_LAT * math.cos(math.radians(lat_q * 0.01))
+
+def _meters_per_lon(lat):
+    """Meters per degree of longitude at a latitude, cached per 0.01 degree"""
+    return _meters_per_lon_q(int(round(lat * 100)))
+
+def _haversine_term_loop(lat1, lon1, lats, lons):
+    out = np.empty(lats.shape[0])
+    lat1 = math.radians(lat1)
+    lon1 = math.radians(lon1)
+    cos_lat1 = math.cos(lat1)
+    for i in range(lats.shape[0]):
+        lat2 = math.radians(lats[i])
+        out[i] = (math.sin((lat2 - lat1) / 2) ** 2
+                  + cos_lat1 * math.cos(lat2) * math.sin((math.radians(lons[i]) - lon1) / 2) ** 2)
+    return out
+
+def _haversine_term_numpy(lat1, lon1, lats, lons):
+    lat1, lon1 = np.deg2rad(lat1), np.deg2rad(lon1)
+    lats, lons = np.deg2rad(lats), np.deg2rad(lons)
+    return (np.sin((lats - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lats) * np.sin((lons - lon1) / 2) ** 2)
+
+# _haversine_term(lat1, lon1, lats, lons): the haversine term a from one point
+# to each of lats/lons, all in degrees. The distance 2 * R * asin(sqrt(a))
+# grows with a, so nearest-point searches compare a and skip the sqrt and
+# asin. The loop runs compiled with Numba, otherwise the NumPy version does
+# the same work array-wide.
+if NUMBA_AVAILABLE:
+    _haversine_term = njit(cache=True, fastmath=True)(_haversine_term_loop)
+else:
+    _haversine_term = _haversine_term_numpy
+
+def _convex_hull(points):
+    """Convex hull vertices of (n, 2) points, counterclockwise"""
+    if SCIPY_AVAILABLE and len(points) >= 3:
+        try:
+            return points[ConvexHull(points).vertices]
+        except Exception:
+            # Qhull rejects collinear or repeated points, the fallback copes with them
+            pass
+
+    # Andrew's monotone chain
+    pts = sorted(set(map(tuple, points.tolist())))
+    if len(pts) < 3:
+        return np.array(pts, dtype=np.float64).reshape(-1, 2)
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return np.array(lower[:-1] + upper[:-1], dtype=np.float64)
+
+def _boustrophedon(start, stop, spacing, low, high):
+    """
+    Zig-zag waypoints for lines at start, start + spacing, ... up to stop
+
+    Returns:
+        numpy.ndarray: (2 * lines, 2) array of (line, cross) coordinates, each
+        line running from low to high and the next one back
+    """
+    # Line positions from an index rather than a running sum, so there is no drift
+    count = int(math.floor((stop - start) / spacing + 1e-9)) + 1 if stop >= start else 0
+    if 2 * count > MAX_SURVEILLANCE_WAYPOINTS:
+        raise ValueError(f"path would need {2 * count} waypoints, the limit is "
+                         f"{MAX_SURVEILLANCE_WAYPOINTS}; increase the line spacing")
+    lines = start + np.arange(count) * spacing
+    forward = np.arange(count) % 2 == 0
+
+    points = np.empty((2 * count, 2))
+    points[0::2, 0] = lines
+    points[1::2, 0] = lines
+    points[0::2, 1] = np.where(forward, low, high)
+    points[1::2, 1] = np.where(forward, high, low)
+    return points
 
 class DroneController:
     """Manages drone flight control operations"""
@@ -30,6 +156,21 @@ class DroneController:
         self.is_available = False
         self.current_tilt_pwm = 1000  # Default middle position (range is usually 600-1650)
         self.last_pwm_value = 1000  # Keep track of the last PWM value
+        self._servo_msgs = {}  # DO_SET_SERVO messages by servo number, reused by set_servo
+        self._servo_lock = threading.Lock()  # Held while a reused message is filled in and sent
+        self._has_channel_overrides = False  # Probed once at connect, see _initialize_vehicle
+        
+        # Callbacks fed from DroneKit's location updates, see add_location_listener
+        self._location_listeners = []
+        self._last_location_time = 0.0
+        
+        # Surveillance missions run one at a time on a single worker thread.
+        # The lock is held from accepting a mission until it has finished, so
+        # a second one is refused instead of starting by itself later
+        self._mission_queue = queue.Queue(maxsize=1)
+        self._mission_lock = threading.Lock()
+        self._mission_thread = threading.Thread(target=self._mission_loop, daemon=True)
+        self._mission_thread.start()
         
         # Initialize connection to the flight controller
         self._initialize_vehicle()
@@ -37,26 +178,28 @@ class DroneController:
     def _initialize_vehicle(self):
         """Initialize the connection to the Pixhawk controller"""
         if not DRONE_KIT_AVAILABLE:
-            print("[Drone] DroneKit not available. Flight control disabled.")
+            log.warning("[Drone] DroneKit not available. Flight control disabled.")
             return False
         
         try:
-            print("[Drone] Connecting to Pixhawk...")
+            log.info("[Drone] Connecting to Pixhawk...")
             # Connect to the vehicle - timeouts after 60 seconds
             self.vehicle = connect('/dev/drona', wait_ready=True, timeout=60)
-            print(f"[Drone] Connected to Pixhawk: {self.vehicle.version}")
+            log.info("[Drone] Connected to Pixhawk: %s", self.vehicle.version)
             
             # Initialize channel overrides
-            if not hasattr(self.vehicle.channels, 'overrides'):
-                print("[Drone] Creating channel overrides dictionary")
+            self._has_channel_overrides = hasattr(self.vehicle.channels, 'overrides')
+            if not self._has_channel_overrides:
+                log.info("[Drone] Creating channel overrides dictionary")
                 self.vehicle.channels.overrides = {}
+                self._has_channel_overrides = True
             
             # Set initial flight mode to STABILIZE
             try:
                 self.vehicle.mode = VehicleMode("STABILIZE")
-                print(f"[Drone] Flight mode set to: {self.vehicle.mode.name}")
+                log.info("[Drone] Flight mode set to: %s", self.vehicle.mode.name)
             except Exception as e:
-                print(f"[Drone] Error setting initial flight mode: {e}")
+                log.error("[Drone] Error setting initial flight mode: %s", e)
             
             # Add listeners for important drone info
             # Store reference to controller instance
@@ -67,10 +210,13 @@ class DroneController:
             # def listener(vehicle_self, name, message):
             #     pass
             
+            # Push location updates instead of having consumers poll for them
+            self.vehicle.add_attribute_listener('location.global_relative_frame', self._on_location_update)
+            
             # Log basic drone info
-            print(f"[Drone] Battery: {self.vehicle.battery.level}%")
-            print(f"[Drone] GPS: {self.vehicle.gps_0.fix_type} - Satellites: {self.vehicle.gps_0.satellites_visible}")
-            print(f"[Drone] Armed: {self.vehicle.armed}")
+            log.info("[Drone] Battery: %s%%", self.vehicle.battery.level)
+            log.info("[Drone] GPS: %s - Satellites: %s", self.vehicle.gps_0.fix_type, self.vehicle.gps_0.satellites_visible)
+            log.info("[Drone] Armed: %s", self.vehicle.armed)
             
             # Set camera tilt to middle position
             self.set_servo(9, 1000)
@@ -79,8 +225,8 @@ class DroneController:
             return True
             
         except Exception as e:
-            print(f"[Drone] Failed to connect to Pixhawk: {e}")
-            print("[Drone] Check if the Pixhawk is properly connected at '/dev/drona'")
+            log.warning("[Drone] Failed to connect to Pixhawk: %s", e)
+            log.info("[Drone] Check if the Pixhawk is properly connected at '/dev/drona'")
             self.vehicle = None
             self.is_available = False
             return False
@@ -92,26 +238,34 @@ class DroneController:
             self.last_pwm_value = pwm_value
             
         try:
-            print(f"[Drone] Setting servo {servo_num} to PWM {pwm_value}")
+            log.debug("[Drone] Setting servo %s to PWM %s", servo_num, pwm_value)
             
             if self.is_available and self.vehicle:
-                # Send command to Pixhawk
-                msg = self.vehicle.message_factory.command_long_encode(
-                    0, 0,  # target system, target component
-                    mavutil.mavlink.MAV_CMD_DO_SET_SERVO,
-                    0,  # confirmation
-                    servo_num,  # servo number
-                    pwm_value,  # PWM value
-                    0, 0, 0, 0, 0  # unused parameters
-                )
-                self.vehicle.send_mavlink(msg)
-                print(f"[Drone] Sent servo command to Pixhawk")
+                # Send command to Pixhawk, only the PWM changes between commands.
+                # Called from the event loop and from worker threads, so the
+                # shared message is only touched under the lock
+                with self._servo_lock:
+                    msg = self._servo_msgs.get(servo_num)
+                    if msg is None:
+                        msg = self.vehicle.message_factory.command_long_encode(
+                            0, 0,  # target system, target component
+                            mavutil.mavlink.MAV_CMD_DO_SET_SERVO,
+                            0,  # confirmation
+                            servo_num,  # servo number
+                            pwm_value,  # PWM value
+                            0, 0, 0, 0, 0  # unused parameters
+                        )
+                        self._servo_msgs[servo_num] = msg
+                    else:
+                        msg.param2 = pwm_value
+                    self.vehicle.send_mavlink(msg)
+                log.debug("[Drone] Sent servo command to Pixhawk")
                 return True
             else:
-                print(f"[Drone] Pixhawk not connected, servo command simulated")
+                log.info("[Drone] Pixhawk not connected, servo command simulated")
                 return False
         except Exception as e:
-            print(f"[Drone] Error setting servo: {e}")
+            log.error("[Drone] Error setting servo: %s", e)
             return False
     
     def set_rc_channel(self, channel_num, pwm_value):
@@ -126,7 +280,7 @@ class DroneController:
                 
             pwm_value = max(1000, min(2000, pwm_value))
             
-            print(f"[Drone] Setting RC channel {channel_num} to PWM {pwm_value}")
+            log.debug("[Drone] Setting RC channel %s to PWM %s", channel_num, pwm_value)
             
             if self.is_available and self.vehicle:
                 # Ensure we have an overrides dictionary
@@ -138,14 +292,13 @@ class DroneController:
                 
                 # Set the channel override
                 self.vehicle.channels.overrides[channel_key] = pwm_value
-                print(f"[Drone] Successfully set channel {channel_num} to {pwm_value}")
+                log.debug("[Drone] Successfully set channel %s to %s", channel_num, pwm_value)
                 return True
             else:
-                print(f"[Drone] Pixhawk not connected, RC channel {channel_num} set simulated")
+                log.info("[Drone] Pixhawk not connected, RC channel %s set simulated", channel_num)
                 return False
         except Exception as e:
-            print(f"[Drone] Error setting RC channel: {e}")
-            import traceback
+            log.error("[Drone] Error setting RC channel: %s", e)
             traceback.print_exc()
             return False
     
@@ -164,13 +317,13 @@ class DroneController:
     def arm(self):
         """Arm the drone's motors"""
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't arm")
+            log.warning("[Drone] Vehicle not available, can't arm")
             return False
             
         try:
-            print("[Drone] Arming motors")
+            log.info("[Drone] Arming motors")
             self.vehicle.armed = True
-            print("[Drone] Waiting for arming...")
+            log.info("[Drone] Waiting for arming...")
             
             # Wait for arming to complete
             start_time = time.time()
@@ -178,24 +331,24 @@ class DroneController:
                 time.sleep(0.5)
                 
             if self.vehicle.armed:
-                print("[Drone] Armed!")
+                log.info("[Drone] Armed!")
                 return True
             else:
-                print("[Drone] Arming timed out")
+                log.warning("[Drone] Arming timed out")
                 return False
         except Exception as e:
-            print(f"[Drone] Error arming: {e}")
+            log.error("[Drone] Error arming: %s", e)
             return False
     
     def takeoff(self, altitude=2.0):
         """Command the drone to take off to the specified altitude"""
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't takeoff")
+            log.warning("[Drone] Vehicle not available, can't takeoff")
             return False
             
         try:
             if not self.vehicle.armed:
-                print("[Drone] Cannot takeoff - not armed")
+                log.warning("[Drone] Cannot takeoff - not armed")
                 return False
                 
             # Set mode to GUIDED (required for takeoff)
@@ -206,55 +359,55 @@ class DroneController:
                 time.sleep(0.1)
                 
             if self.vehicle.mode.name != "GUIDED":
-                print("[Drone] Failed to enter GUIDED mode")
+                log.warning("[Drone] Failed to enter GUIDED mode")
                 return False
                 
             # Take off to specified altitude
             self.vehicle.simple_takeoff(altitude)
-            print(f"[Drone] Taking off to {altitude} meters")
+            log.info("[Drone] Taking off to %s meters", altitude)
             return True
         except Exception as e:
-            print(f"[Drone] Error during takeoff: {e}")
+            log.error("[Drone] Error during takeoff: %s", e)
             return False
     
     def land(self):
         """Command the drone to land"""
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't land")
+            log.warning("[Drone] Vehicle not available, can't land")
             return False
             
         try:
-            print("[Drone] Landing")
+            log.info("[Drone] Landing")
             self.vehicle.mode = VehicleMode("LAND")
-            print("[Drone] Landing mode activated")
+            log.info("[Drone] Landing mode activated")
             return True
         except Exception as e:
-            print(f"[Drone] Error during landing: {e}")
+            log.error("[Drone] Error during landing: %s", e)
             return False
     
     def return_to_launch(self):
         """Command the drone to return to launch location"""
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't RTL")
+            log.warning("[Drone] Vehicle not available, can't RTL")
             return False
             
         try:
-            print("[Drone] Returning to launch")
+            log.info("[Drone] Returning to launch")
             self.vehicle.mode = VehicleMode("RTL")
-            print("[Drone] RTL mode activated")
+            log.info("[Drone] RTL mode activated")
             return True
         except Exception as e:
-            print(f"[Drone] Error during RTL: {e}")
+            log.error("[Drone] Error during RTL: %s", e)
             return False
     
     def goto(self, lat, lon, alt):
         """Command the drone to go to a specific global location"""
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't goto")
+            log.warning("[Drone] Vehicle not available, can't goto")
             return False
             
         try:
-            print(f"[Drone] Going to: Lat {lat}, Lon {lon}, Alt {alt}")
+            log.info("[Drone] Going to: Lat %s, Lon %s, Alt %s", lat, lon, alt)
             
             # Set to GUIDED mode if needed
             if self.vehicle.mode.name != "GUIDED":
@@ -270,10 +423,10 @@ class DroneController:
             
             # Send drone to target location
             self.vehicle.simple_goto(target_location)
-            print(f"[Drone] Sent goto command to: {target_location}")
+            log.info("[Drone] Sent goto command to: %s", target_location)
             return True
         except Exception as e:
-            print(f"[Drone] Error during goto: {e}")
+            log.error("[Drone] Error during goto: %s", e)
             return False
     
     def move_relative(self, forward, right, down):
@@ -289,7 +442,7 @@ class DroneController:
             bool: Success of the operation
         """
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't move relative")
+            log.warning("[Drone] Vehicle not available, can't move relative")
             return False
             
         try:
@@ -302,8 +455,7 @@ class DroneController:
             
             # Convert NED (North, East, Down) coordinates to lat/lon
             # These conversion factors are approximate and depend on location
-            METERS_PER_LAT = 111320  # meters per degree latitude
-            METERS_PER_LON = 111320 * math.cos(math.radians(current.lat))  # meters per degree longitude
+            meters_per_lon = _meters_per_lon(current.lat)
             
             # Calculate offsets
             # Rotate the forward/right values based on heading
@@ -312,7 +464,7 @@ class DroneController:
             
             # Convert to lat/lon
             lat_offset = north_offset / METERS_PER_LAT
-            lon_offset = east_offset / METERS_PER_LON
+            lon_offset = east_offset / meters_per_lon
             
             # Calculate new position
             new_lat = current.lat + lat_offset
@@ -331,11 +483,11 @@ class DroneController:
             # Send command
             self.vehicle.simple_goto(target)
             
-            print(f"[Drone] Moving relative: Forward {forward}m, Right {right}m, Down {down}m")
-            print(f"[Drone] New target: Lat {new_lat}, Lon {new_lon}, Alt {new_alt}")
+            log.info("[Drone] Moving relative: Forward %sm, Right %sm, Down %sm", forward, right, down)
+            log.info("[Drone] New target: Lat %s, Lon %s, Alt %s", new_lat, new_lon, new_alt)
             return True
         except Exception as e:
-            print(f"[Drone] Error moving relative: {e}")
+            log.error("[Drone] Error moving relative: %s", e)
             return False
     
     def get_location(self):
@@ -355,9 +507,41 @@ class DroneController:
                 "heading": self.vehicle.heading
             }
         except Exception as e:
-            print(f"[Drone] Error getting location: {e}")
+            log.error("[Drone] Error getting location: %s", e)
             return None
     
+    def add_location_listener(self, callback):
+        """
+        Call callback(location) with a get_location() dict when the drone moves.
+        
+        Callbacks run on DroneKit's thread, at most once every
+        LOCATION_UPDATE_INTERVAL seconds.
+        """
+        self._location_listeners.append(callback)
+    
+    def remove_location_listener(self, callback):
+        """Stop calling a callback registered with add_location_listener"""
+        if callback in self._location_listeners:
+            self._location_listeners.remove(callback)
+    
+    def _on_location_update(self, vehicle, name, value):
+        """DroneKit attribute listener for location.global_relative_frame"""
+        if not self._location_listeners:
+            return
+        now = time.monotonic()
+        if now - self._last_location_time < LOCATION_UPDATE_INTERVAL:
+            return
+        self._last_location_time = now
+        
+        location = self.get_location()
+        if location is None:
+            return
+        for callback in list(self._location_listeners):
+            try:
+                callback(location)
+            except Exception as e:
+                log.error("[Drone] Error in location listener: %s", e)
+    
     def start_surveillance_mission(self, points, speed, altitude, style, line_spacing, buffer_zone):
         """
         Start a surveillance mission over the defined area
@@ -374,7 +558,11 @@ class DroneController:
             bool: Success of the operation
         """
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't start surveillance mission")
+            log.warning("[Drone] Vehicle not available, can't start surveillance mission")
+            return False
+
+        if not self._mission_lock.acquire(blocking=False):
+            log.warning("[Drone] A surveillance mission is already in progress")
             return False
 
         try:
@@ -388,32 +576,44 @@ class DroneController:
                     time.sleep(0.1)
 
             if not self.vehicle.armed:
-                print("[Drone] WARNING: Vehicle not armed, surveillance mission may fail")
+                log.warning("[Drone] Vehicle not armed, surveillance mission may fail")
 
             # Calculate the surveillance path
             path = self._calculate_surveillance_path(points, speed, altitude, style, line_spacing, buffer_zone)
 
             if len(path) == 0:
-                print("[Drone] Failed to calculate a valid surveillance path")
+                log.warning("[Drone] Failed to calculate a valid surveillance path")
+                self._mission_lock.release()
                 return False
 
-            # Start a thread to execute the mission
-            mission_thread = threading.Thread(
-                target=self._execute_surveillance_mission,
-                args=(path, speed, altitude)
-            )
-            mission_thread.daemon = True
-            mission_thread.start()
+            # Hand the mission to the mission worker, which releases the lock
+            # when it's done. The lock keeps the queue empty here
+            self._mission_queue.put_nowait((path, speed, altitude))
 
-            print(f"[Drone] Surveillance mission started with {len(path)} waypoints")
+            log.info("[Drone] Surveillance mission started with %s waypoints", len(path))
             return True
 
         except Exception as e:
-            print(f"[Drone] Error starting surveillance mission: {e}")
-            import traceback
+            log.error("[Drone] Error starting surveillance mission: %s", e)
             traceback.print_exc()
+            self._mission_lock.release()
             return False
 
+    def is_mission_in_progress(self):
+        """Whether a surveillance mission is being set up or flown"""
+        return self._mission_lock.locked()
+
+    def _mission_loop(self):
+        """Run queued surveillance missions until cleanup sends None"""
+        while True:
+            mission = self._mission_queue.get()
+            if mission is None:
+                break
+            try:
+                self._execute_surveillance_mission(*mission)
+            finally:
+                self._mission_lock.release()
+
     def _calculate_surveillance_path(self, points, speed, altitude, style, line_spacing, buffer_zone):
         """
         Calculate a surveillance pattern path based on the given area and parameters
@@ -427,7 +627,7 @@ class DroneController:
             buffer_zone: Extra buffer around the area in meters
 
         Returns:
-            list: List of (lat, lon) waypoints for the surveillance path
+            numpy.ndarray: (n, 2) array of (lat, lon) waypoints for the surveillance path
         """
         try:
             # Convert points to a numpy array for easier calculation
@@ -435,7 +635,7 @@ class DroneController:
 
             # Calculate the centroid of the polygon
             centroid = np.mean(points_array, axis=0)
-            print(f"[Drone] Area centroid: Lat {centroid[0]}, Lon {centroid[1]}")
+            log.info("[Drone] Area centroid: Lat %s, Lon %s", centroid[0], centroid[1])
 
             # Get current location to calculate distance to the area
             current_location = None
@@ -446,23 +646,33 @@ class DroneController:
 
             # Calculate the oriented bounding box of the area
             rect_points, rect_angle = self._calculate_oriented_bounding_box(points_array)
+            log.info("[Drone] Bounding box rotated %.1f degrees", rect_angle)
+
+            # Plan in the box's own frame, where it is axis aligned
+            rect_center = np.mean(rect_points, axis=0)
+            if rect_angle:
+                rect_points = self._rotate_polygon(rect_points, -rect_angle, rect_center)
+                if current_location is not None:
+                    current_location = self._rotate_polygon(
+                        np.array([current_location], dtype=np.float64), -rect_angle, rect_center)[0]
 
             # Add buffer zone to the bounding box
             rect_points_buffered = self._add_buffer_to_polygon(rect_points, buffer_zone)
 
-            # Generate the surveillance pattern within the bounding box
-            if style == "longest":
-                # Use the longest side of the bounding box as the pattern direction
-                return self._generate_parallel_pattern(rect_points_buffered, line_spacing, current_location)
-            else:
-                # Use the shortest side of the bounding box as the pattern direction
-                # Rotate the bounding box 90 degrees
-                rotated_rect = self._rotate_polygon(rect_points_buffered, 90)
-                return self._generate_parallel_pattern(rotated_rect, line_spacing, current_location)
+            # Generate the surveillance pattern within the bounding box, with the
+            # passes along its longest or its shortest side
+            waypoints = self._generate_parallel_pattern(
+                rect_points_buffered, line_spacing, current_location,
+                along_longest=(style == "longest")
+            )
+
+            # And turn the path back with the box
+            if rect_angle and len(waypoints):
+                waypoints = self._rotate_polygon(waypoints, rect_angle, rect_center)
+            return waypoints
 
         except Exception as e:
-            print(f"[Drone] Error calculating surveillance path: {e}")
-            import traceback
+            log.error("[Drone] Error calculating surveillance path: %s", e)
             traceback.print_exc()
             return []
 
@@ -470,33 +680,55 @@ class DroneController:
         """
         Calculate the minimum oriented bounding box for a set of points
 
+        Rotating calipers over the convex hull: the minimum-area rectangle has
+        a side on one of the hull's edges, so each edge direction is tried.
+
         Args:
-            points: Numpy array of points shape (n, 2)
+            points: Numpy array of (lat, lon) points shape (n, 2)
 
         Returns:
-            tuple: (rectangle_points, angle_of_orientation)
+            tuple: (rectangle_points, angle_of_orientation), the corners in the
+            order bottom-left, bottom-right, top-right, top-left of the box's
+            own frame and its angle in degrees counterclockwise from east
         """
-        # For simplicity, we'll use a axis-aligned bounding box for now
-        # In a production system, you would implement a convex hull + minimum area rectangle algorithm
-
-        min_lat = np.min(points[:, 0])
-        max_lat = np.max(points[:, 0])
-        min_lon = np.min(points[:, 1])
-        max_lon = np.max(points[:, 1])
-
-        # Create the four corners of the bounding box
-        rect_points = np.array([
-            [min_lat, min_lon],  # bottom-left
-            [min_lat, max_lon],  # bottom-right
-            [max_lat, max_lon],  # top-right
-            [max_lat, min_lon]   # top-left
+        # Work in meters east/north of the centroid so angles and areas are true
+        origin = np.mean(points, axis=0)
+        scale = np.array([_meters_per_lon(origin[0]), METERS_PER_LAT])
+        local = (points[:, ::-1] - origin[::-1]) * scale  # (east, north)
+
+        hull = _convex_hull(local)
+        if len(hull) < 2:
+            hull = local[:1]
+
+        # Direction of every hull edge
+        edges = np.roll(hull, -1, axis=0) - hull
+        angles = np.unique(np.mod(np.arctan2(edges[:, 1], edges[:, 0]), np.pi / 2))
+
+        best = None
+        for angle in angles:
+            cos_a, sin_a = math.cos(angle), math.sin(angle)
+            # Hull in the frame rotated by -angle, with one side along an axis
+            rotated = np.dot(hull, np.array([[cos_a, -sin_a], [sin_a, cos_a]]))
+            lo = rotated.min(axis=0)
+            hi = rotated.max(axis=0)
+            area = (hi[0] - lo[0]) * (hi[1] - lo[1])
+            if best is None or area < best[0]:
+                best = (area, angle, lo, hi)
+
+        _, angle, lo, hi = best
+        corners = np.array([
+            [lo[0], lo[1]],  # bottom-left
+            [hi[0], lo[1]],  # bottom-right
+            [hi[0], hi[1]],  # top-right
+            [lo[0], hi[1]]   # top-left
         ])
 
-        # Calculate angle - in this simplified version, we're using 0 degrees
-        # because we're using an axis-aligned bounding box
-        angle = 0
+        # Back to the local frame, then to (lat, lon)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        corners = np.dot(corners, np.array([[cos_a, sin_a], [-sin_a, cos_a]]))
+        rect_points = (corners / scale)[:, ::-1] + origin
 
-        return rect_points, angle
+        return rect_points, math.degrees(angle)
 
     def _add_buffer_to_polygon(self, points, buffer_distance):
         """
@@ -514,8 +746,8 @@ class DroneController:
 
         # Convert buffer from meters to approximate lat/lon degrees
         # This is a very rough approximation
-        lat_buffer = buffer_distance / 111320.0  # 1 degree lat is approximately 111.32 km
-        lon_buffer = buffer_distance / (111320.0 * math.cos(math.radians(np.mean(points[:, 0]))))
+        lat_buffer = buffer_distance / METERS_PER_LAT
+        lon_buffer = buffer_distance / _meters_per_lon(np.mean(points[:, 0]))
 
         # Apply the buffer
         buffered_points = points.copy()
@@ -530,37 +762,39 @@ class DroneController:
 
         return buffered_points
 
-    def _rotate_polygon(self, points, angle_degrees):
+    def _rotate_polygon(self, points, angle_degrees, center=None):
         """
         Rotate a polygon around its centroid
 
         Args:
-            points: Numpy array of points shape (n, 2)
-            angle_degrees: Rotation angle in degrees
+            points: Numpy array of (lat, lon) points shape (n, 2)
+            angle_degrees: Rotation angle in degrees, counterclockwise
+            center: Optional (lat, lon) to rotate around instead of the centroid
 
         Returns:
             numpy.ndarray: Rotated polygon points
         """
         # Calculate centroid
-        centroid = np.mean(points, axis=0)
+        if center is None:
+            center = np.mean(points, axis=0)
 
         # Convert angle to radians
         angle_rad = math.radians(angle_degrees)
-
-        # Create rotation matrix
-        rot_matrix = np.array([
-            [math.cos(angle_rad), -math.sin(angle_rad)],
-            [math.sin(angle_rad), math.cos(angle_rad)]
-        ])
-
-        # Translate points to origin, rotate, and translate back
-        centered_points = points - centroid
-        rotated_points = np.dot(centered_points, rot_matrix.T)
-        rotated_points = rotated_points + centroid
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad)
+
+        # Translate points to origin in meters, rotate, and translate back.
+        # Written out per axis, for a handful of points that beats a matmul.
+        meters_per_lon = _meters_per_lon(center[0])
+        north = (points[:, 0] - center[0]) * METERS_PER_LAT
+        east = (points[:, 1] - center[1]) * meters_per_lon
+        rotated_points = np.empty_like(points, dtype=np.float64)
+        rotated_points[:, 0] = (sin_a * east + cos_a * north) / METERS_PER_LAT + center[0]
+        rotated_points[:, 1] = (cos_a * east - sin_a * north) / meters_per_lon + center[1]
 
         return rotated_points
 
-    def _generate_parallel_pattern(self, rect_points, line_spacing, current_location=None):
+    def _generate_parallel_pattern(self, rect_points, line_spacing, current_location=None, along_longest=True):
         """
         Generate a parallel line pattern for surveillance
 
@@ -568,80 +802,48 @@ class DroneController:
             rect_points: Numpy array of rectangle points shape (4, 2)
             line_spacing: Spacing between lines in meters
             current_location: Optional tuple (lat, lon) of current drone location
+            along_longest: Run the passes along the longest side of the
+                rectangle, or along the shortest side if False
 
         Returns:
-            list: List of (lat, lon) waypoints for the surveillance path
+            numpy.ndarray: (n, 2) array of (lat, lon) waypoints for the surveillance path
+
+        The whole path is built at once rather than yielded: picking the start
+        needs every waypoint, the caller rotates the path back as a whole and
+        the mission upload needs its length. It is capped at
+        MAX_SURVEILLANCE_WAYPOINTS so it stays small.
         """
         # Convert line spacing from meters to lat/lon degrees
         avg_lat = np.mean(rect_points[:, 0])
-        lat_spacing = line_spacing / 111320.0  # 1 degree lat is approximately 111.32 km
-        lon_spacing = line_spacing / (111320.0 * math.cos(math.radians(avg_lat)))
-
-        # Determine which sides are longer
-        width = abs(rect_points[1, 1] - rect_points[0, 1])  # lon difference
-        height = abs(rect_points[3, 0] - rect_points[0, 0])  # lat difference
-
-        # Points will be ordered to ensure we go from the nearest point to the current location if available
-        waypoints = []
-
-        if width > height:  # If width is longer, make horizontal passes
-            # Sort vertices by latitude (north-south)
-            south = min(rect_points[:, 0])
-            north = max(rect_points[:, 0])
-            west = min(rect_points[:, 1])
-            east = max(rect_points[:, 1])
-
-            # Generate parallel lines from south to north
-            current_lat = south
-            go_east = True  # Start going east
-
-            while current_lat <= north:
-                if go_east:
-                    waypoints.append((current_lat, west))
-                    waypoints.append((current_lat, east))
-                else:
-                    waypoints.append((current_lat, east))
-                    waypoints.append((current_lat, west))
-
-                current_lat += lat_spacing
-                go_east = not go_east  # Toggle direction
-
-        else:  # If height is longer, make vertical passes
-            # Sort vertices by longitude (east-west)
-            south = min(rect_points[:, 0])
-            north = max(rect_points[:, 0])
-            west = min(rect_points[:, 1])
-            east = max(rect_points[:, 1])
-
-            # Generate parallel lines from west to east
-            current_lon = west
-            go_north = True  # Start going north
-
-            while current_lon <= east:
-                if go_north:
-                    waypoints.append((south, current_lon))
-                    waypoints.append((north, current_lon))
-                else:
-                    waypoints.append((north, current_lon))
-                    waypoints.append((south, current_lon))
-
-                current_lon += lon_spacing
-                go_north = not go_north  # Toggle direction
-
-        # Calculate nearest point to current location if available
-        if current_location is not None:
-            # Find the closest point to current location
-            distances = []
-            for i, wp in enumerate(waypoints):
-                dist = self._haversine_distance(current_location[0], current_location[1], wp[0], wp[1])
-                distances.append((i, dist))
-
-            # Sort by distance
-            distances.sort(key=lambda x: x[1])
-            nearest_idx = distances[0][0]
+        lat_spacing = line_spacing / METERS_PER_LAT
+        lon_spacing = line_spacing / _meters_per_lon(avg_lat)
+
+        # Determine which sides are longer, in meters
+        width = abs(rect_points[1, 1] - rect_points[0, 1]) * _meters_per_lon(avg_lat)  # lon difference
+        height = abs(rect_points[3, 0] - rect_points[0, 0]) * METERS_PER_LAT  # lat difference
+
+        south = rect_points[:, 0].min()
+        north = rect_points[:, 0].max()
+        west = rect_points[:, 1].min()
+        east = rect_points[:, 1].max()
+
+        if (width > height) == along_longest:  # East-west passes
+            # Parallel lines from south to north, starting eastwards
+            waypoints = _boustrophedon(south, north, lat_spacing, west, east)
+        else:  # North-south passes
+            # Parallel lines from west to east, starting northwards
+            waypoints = _boustrophedon(west, east, lon_spacing, south, north)[:, ::-1]
+
+        # Start from the waypoint nearest to the current location if available
+        if current_location is not None and len(waypoints):
+            terms = _haversine_term(
+                float(current_location[0]), float(current_location[1]),
+                np.ascontiguousarray(waypoints[:, 0]), np.ascontiguousarray(waypoints[:, 1])
+            )
+            nearest_idx = int(np.argmin(terms))
 
             # Reorder waypoints to start from the nearest point
-            waypoints = waypoints[nearest_idx:] + waypoints[:nearest_idx]
+            waypoints = np.roll(waypoints, -nearest_idx, axis=0)
 
         return waypoints
 
@@ -649,47 +851,140 @@ class DroneController:
         """
         Execute a surveillance mission by visiting all waypoints
 
+        The path is uploaded as a mission and flown in AUTO mode so the
+        autopilot sequences the waypoints itself. If the upload fails the
+        waypoints are flown one by one in GUIDED mode instead.
+
         Args:
-            waypoints: List of (lat, lon) waypoints for the surveillance path
+            waypoints: (n, 2) array of (lat, lon) waypoints for the surveillance path
             speed: Drone speed in m/s
             altitude: Surveillance altitude in meters
         """
         if not self.is_available or not self.vehicle:
-            print("[Drone] Vehicle not available, can't execute surveillance mission")
+            log.warning("[Drone] Vehicle not available, can't execute surveillance mission")
             return
 
         try:
-            print(f"[Drone] Executing surveillance mission with {len(waypoints)} waypoints")
+            log.info("[Drone] Executing surveillance mission with %s waypoints", len(waypoints))
 
-            # Make sure we're in GUIDED mode
-            if self.vehicle.mode.name != "GUIDED":
-                self.vehicle.mode = VehicleMode("GUIDED")
-                time.sleep(1)
+            try:
+                last_seq = self._upload_mission(waypoints, speed, altitude)
+            except Exception as e:
+                log.warning("[Drone] Mission upload failed (%s), flying waypoints in GUIDED mode", e)
+                self._fly_guided_waypoints(waypoints, altitude)
+                return
 
-            # Execute the surveillance pattern
-            for i, (lat, lon) in enumerate(waypoints):
-                # Check if we're still in GUIDED mode - user might have taken control
-                if self.vehicle.mode.name != "GUIDED":
-                    print("[Drone] Mission aborted - no longer in GUIDED mode")
+            self._fly_auto_mission(last_seq, waypoints, speed)
+
+        except Exception as e:
+            log.error("[Drone] Error executing surveillance mission: %s", e)
+            traceback.print_exc()
+
+    def _upload_mission(self, waypoints, speed, altitude):
+        """
+        Replace the vehicle's mission with the surveillance path
+
+        Returns:
+            int: Sequence number of the last mission item
+        """
+        frame = mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT
+        cmds = self.vehicle.commands
+        cmds.clear()
+        # Ground speed for the whole mission (param1 = 1 selects ground speed)
+        cmds.add(Command(0, 0, 0, frame, mavutil.mavlink.MAV_CMD_DO_CHANGE_SPEED,
+                         0, 0, 1, speed, -1, 0, 0, 0, 0))
+        for lat, lon in waypoints:
+            cmds.add(Command(0, 0, 0, frame, mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
+                             0, 0, 0, WAYPOINT_ACCURACY, 0, 0, lat, lon, altitude))
+        cmds.upload()
+        log.info("[Drone] Uploaded mission with %s items", cmds.count)
+        # Item 0 is home, so the last uploaded item has the sequence number count
+        return cmds.count
+
+    def _mission_time_limit(self, waypoints, speed):
+        """Longest an AUTO mission over waypoints at speed should take, in seconds"""
+        lats = waypoints[:, 0]
+        dy = np.diff(lats) * METERS_PER_LAT
+        dx = np.diff(waypoints[:, 1]) * _meters_per_lon(float(lats.mean()))
+        length = float(np.hypot(dx, dy).sum())
+        return MISSION_TIME_FACTOR * length / max(speed, 0.5) + MISSION_TIME_SLACK
+
+    def _at_last_waypoint(self, last_seq, last_lat, last_lon):
+        """Whether the vehicle is heading for the last mission item and already within reach of it"""
+        if self.vehicle.commands.next < last_seq:
+            return False
+        location = self.vehicle.location.global_relative_frame
+        if location.lat is None or location.lon is None:
+            return False
+        distance = math.hypot(
+            (location.lat - last_lat) * METERS_PER_LAT,
+            (location.lon - last_lon) * _meters_per_lon(last_lat)
+        )
+        return distance <= WAYPOINT_ACCURACY
+
+    def _fly_auto_mission(self, last_seq, waypoints, speed):
+        """Fly the uploaded mission in AUTO mode until its last item is reached"""
+        finished = threading.Event()
+        last_lat, last_lon = (float(v) for v in waypoints[-1])
+        time_limit = self._mission_time_limit(waypoints, speed)
+        deadline = time.monotonic() + time_limit
+
+        def on_item_reached(vehicle, name, message):
+            if message.seq >= last_seq:
+                finished.set()
+
+        self.vehicle.add_message_listener('MISSION_ITEM_REACHED', on_item_reached)
+        try:
+            self.vehicle.commands.next = 0
+            self.vehicle.mode = VehicleMode("AUTO")
+            timeout = 5
+            start = time.time()
+            while self.vehicle.mode.name != "AUTO" and time.time() - start < timeout:
+                time.sleep(0.1)
+
+            while not finished.wait(1.0):
+                # Check if we're still in AUTO mode - user might have taken control
+                if self.vehicle.mode.name != "AUTO":
+                    log.warning("[Drone] Mission aborted - no longer in AUTO mode")
+                    return
+                # The last MISSION_ITEM_REACHED can be lost on the link, so also
+                # go by the current mission item and the position
+                if self._at_last_waypoint(last_seq, last_lat, last_lon):
+                    break
+                if time.monotonic() > deadline:
+                    log.warning("[Drone] Mission not finished after %.0f seconds, no longer tracking it", time_limit)
                     return
+        finally:
+            self.vehicle.remove_message_listener('MISSION_ITEM_REACHED', on_item_reached)
 
-                print(f"[Drone] Moving to waypoint {i+1}/{len(waypoints)}: Lat {lat}, Lon {lon}, Alt {altitude}")
+        log.info("[Drone] Surveillance mission completed")
 
-                # Create target location
-                target_location = LocationGlobalRelative(lat, lon, altitude)
+    def _fly_guided_waypoints(self, waypoints, altitude):
+        """Visit the waypoints one at a time with simple_goto in GUIDED mode"""
+        # Make sure we're in GUIDED mode
+        if self.vehicle.mode.name != "GUIDED":
+            self.vehicle.mode = VehicleMode("GUIDED")
+            time.sleep(1)
 
-                # Send drone to target location
-                self.vehicle.simple_goto(target_location)
+        # Execute the surveillance pattern
+        for i, (lat, lon) in enumerate(waypoints):
+            # Check if we're still in GUIDED mode - user might have taken control
+            if self.vehicle.mode.name != "GUIDED":
+                log.warning("[Drone] Mission aborted - no longer in GUIDED mode")
+                return
 
-                # Wait until we reach the waypoint within a certain radius or timeout
-                self._wait_for_waypoint(lat, lon, timeout=60, accuracy=5.0)
+            log.debug("[Drone] Moving to waypoint %s/%s: Lat %s, Lon %s, Alt %s", i+1, len(waypoints), lat, lon, altitude)
 
-            print("[Drone] Surveillance mission completed")
+            # Create target location
+            target_location = LocationGlobalRelative(lat, lon, altitude)
 
-        except Exception as e:
-            print(f"[Drone] Error executing surveillance mission: {e}")
-            import traceback
-            traceback.print_exc()
+            # Send drone to target location
+            self.vehicle.simple_goto(target_location)
+
+            # Wait until we reach the waypoint within a certain radius or timeout
+            self._wait_for_waypoint(lat, lon, timeout=60, accuracy=WAYPOINT_ACCURACY)
+
+        log.info("[Drone] Surveillance mission completed")
 
     def _wait_for_waypoint(self, target_lat, target_lon, timeout=60, accuracy=5.0):
         """
@@ -701,70 +996,76 @@ class DroneController:
             timeout: Maximum time to wait in seconds
             accuracy: Required accuracy in meters
         """
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            # Get current location
-            current = self.vehicle.location.global_relative_frame
-
+        # Checked on every position report from the autopilot rather than on
+        # a sleep timer, so arrival is noticed as soon as it is reported
+        done = threading.Event()
+        result = {}
+        # Within a few meters a flat-earth distance is accurate to well under a
+        # meter, so scale the degree differences once instead of using haversine.
+        # GLOBAL_POSITION_INT carries degrees * 1e7 as integers, compare in those units.
+        target_lat_i = round(target_lat * 1e7)
+        target_lon_i = round(target_lon * 1e7)
+        lat_scale = METERS_PER_LAT / 1e7
+        lon_scale = _meters_per_lon(target_lat) / 1e7
+
+        def on_position(vehicle, name, message):
             # Calculate distance to target
-            distance = self._haversine_distance(
-                current.lat, current.lon,
-                target_lat, target_lon
+            distance = math.hypot(
+                (message.lat - target_lat_i) * lat_scale,
+                (message.lon - target_lon_i) * lon_scale
             )
 
             # If we're within the required accuracy, we've reached the waypoint
             if distance <= accuracy:
-                print(f"[Drone] Reached waypoint within {distance:.2f}m")
-                return True
-
+                result["distance"] = distance
+                done.set()
             # Check if we're still in GUIDED mode
-            if self.vehicle.mode.name != "GUIDED":
-                print("[Drone] No longer in GUIDED mode, aborting waypoint wait")
-                return False
-
-            # Sleep to avoid cpu hogging
-            time.sleep(0.5)
-
-        print(f"[Drone] Waypoint timeout after {timeout} seconds")
-        return False
-
-    def _haversine_distance(self, lat1, lon1, lat2, lon2):
-        """
-        Calculate the great circle distance between two points on the earth
+            elif vehicle.mode.name != "GUIDED":
+                done.set()
 
-        Args:
-            lat1, lon1: First point coordinates
-            lat2, lon2: Second point coordinates
+        self.vehicle.add_message_listener('GLOBAL_POSITION_INT', on_position)
+        try:
+            arrived = done.wait(timeout)
+        finally:
+            self.vehicle.remove_message_listener('GLOBAL_POSITION_INT', on_position)
 
-        Returns:
-            float: Distance in meters
-        """
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+        if arrived:
+            if "distance" in result:
+                log.debug("[Drone] Reached waypoint within %.2fm", result['distance'])
+                return True
+            log.warning("[Drone] No longer in GUIDED mode, aborting waypoint wait")
+            return False
 
-        # Haversine formula
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        r = 6371000  # Radius of earth in meters
-        return c * r
+        log.warning("[Drone] Waypoint timeout after %s seconds", timeout)
+        return False
 
     def cleanup(self):
         """Clean up drone control resources"""
+        # Stop the mission worker, dropping a mission that hasn't started yet
+        try:
+            self._mission_queue.get_nowait()
+            self._mission_lock.release()
+        except queue.Empty:
+            pass
+        self._mission_queue.put_nowait(None)
+
         if self.vehicle:
             try:
-                # Reset channel overrides
-                if hasattr(self.vehicle.channels, 'overrides'):
+                self.vehicle.remove_attribute_listener('location.global_relative_frame', self._on_location_update)
+            except Exception as e:
+                log.error("[Drone] Error removing location listener: %s", e)
+            try:
+                # Reset channel overrides. Assign rather than clear(): DroneKit only
+                # sends the override release to the autopilot from the setter
+                if self._has_channel_overrides:
                     self.vehicle.channels.overrides = {}
-                    print("[Drone] Reset all RC channel overrides")
+                    log.info("[Drone] Reset all RC channel overrides")
 
                 # Close the vehicle connection
                 self.vehicle.close()
-                print("[Drone] Vehicle connection closed")
+                log.info("[Drone] Vehicle connection closed")
             except Exception as e:
-                print(f"[Drone] Error during cleanup: {e}")
+                log.error("[Drone] Error during cleanup: %s", e)
 
             self.vehicle = None
             self.is_available = False
\ No newline at end of file
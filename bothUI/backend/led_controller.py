@@ -7,7 +7,18 @@ Handles color setting for visual indicators
 """
 
 import time
+import math
+import logging
 import threading
+from array import array
+from itertools import cycle
+
+from utils import RateLimitFilter, RATE_LIMITED
+
+# Repeats of the errors marked RATE_LIMITED are dropped for a second, so a
+# failing SPI write in an animation or a stream of LED commands doesn't flood the log
+log = logging.getLogger("led")
+log.addFilter(RateLimitFilter(interval=1.0))
 
 # Import Pi5Neo library for LED control
 try:
@@ -15,17 +26,38 @@ try:
     LED_AVAILABLE = True
 except ImportError as e:
     LED_AVAILABLE = False
-    print(f"[LED] Pi5Neo import error: {e}")
-    print("[LED] LED control won't work - module not found")
+    log.warning("[LED] Pi5Neo import error: %s", e)
+    log.warning("[LED] LED control won't work - module not found")
+
+# One sine period as LED levels, int(128 + 127 * sin(x)), for the animations
+_SIN_LUT_SIZE = 1024
+_SIN_LUT_MASK = _SIN_LUT_SIZE - 1
+_SIN_LUT = array('B', [int(128 + 127 * math.sin(2 * math.pi * k / _SIN_LUT_SIZE))
+                       for k in range(_SIN_LUT_SIZE)])
+
+# Rainbow step of 0.024 rad per frame and the green/blue phase offsets of
+# 2.1 and 4.2 rad, in table entries
+_RAINBOW_STEP = 0.024 * _SIN_LUT_SIZE / (2 * math.pi)
+_RAINBOW_OFF_G = int(2.1 * _SIN_LUT_SIZE / (2 * math.pi))
+_RAINBOW_OFF_B = int(4.2 * _SIN_LUT_SIZE / (2 * math.pi))
+
+def _clamp(x):
+    """Convert a colour component to an int in the 0-255 range"""
+    x = int(x)
+    return 0 if x < 0 else 255 if x > 255 else x
 
 class LedController:
     """Controls the LED strip on the drone"""
     
+    # (r, g, b) for each step of the rainbow cycle, built on first use
+    _rainbow_frames = None
+    
     def __init__(self):
         self.neo = None
         self.is_available = False
         self.animation_thread = None
         self.stop_animation = threading.Event()
+        self._last_rgb = None  # Color currently on the strip, see _send_color
         
         # Initialize the LED controller
         self._initialize_leds()
@@ -33,85 +65,88 @@ class LedController:
     def _initialize_leds(self):
         """Initialize the LED controller"""
         if not LED_AVAILABLE:
-            print("[LED] Pi5Neo module not available. LED control disabled.")
+            log.warning("[LED] Pi5Neo module not available. LED control disabled.")
             return False
         
         try:
             # Check if the SPI device exists
             import os
             if os.path.exists('/dev/spidev0.0'):
-                print("[LED] SPI device exists at /dev/spidev0.0")
+                log.info("[LED] SPI device exists at /dev/spidev0.0")
             else:
-                print("[LED] WARNING: SPI device /dev/spidev0.0 does not exist!")
+                log.warning("[LED] WARNING: SPI device /dev/spidev0.0 does not exist!")
                 # Try to list available devices
                 os.system("ls -la /dev/spi* 2>&1 || echo 'No SPI devices found'")
             
             # Initialize the Pi5Neo class with 16 LEDs and an SPI speed of 800kHz
-            print("[LED] Initializing Pi5Neo LED controller")
+            log.info("[LED] Initializing Pi5Neo LED controller")
             self.neo = Pi5Neo('/dev/spidev0.0', 16, 800)
-            print("[LED] Pi5Neo object created successfully")
+            log.info("[LED] Pi5Neo object created successfully")
             
             # Turn on all LEDs to white briefly as a test
-            print("[LED] Testing LEDs with white color")
+            log.info("[LED] Testing LEDs with white color")
             self.neo.fill_strip(255, 255, 255)
             self.neo.update_strip()
-            print("[LED] LED command sent - flashing white to test")
+            log.info("[LED] LED command sent - flashing white to test")
             time.sleep(0.5)
             
             # Then turn them off
             self.neo.fill_strip(0, 0, 0)
             self.neo.update_strip()
-            print("[LED] LEDs turned off after test")
+            log.info("[LED] LEDs turned off after test")
             
             self.is_available = True
             return True
             
         except Exception as e:
-            print(f"[LED] Error initializing Pi5Neo: {e}")
-            import traceback
-            traceback.print_exc()
-            print("[LED] LED control won't work - initialization failed")
+            log.exception("[LED] Error initializing Pi5Neo: %s", e)
+            log.error("[LED] LED control won't work - initialization failed")
             self.neo = None
             self.is_available = False
             return False
     
+    def _send_color(self, r, g, b):
+        """Fill the strip with a color, skipping the SPI write if it's already showing"""
+        rgb = (r, g, b)
+        if rgb == self._last_rgb:
+            return
+        self.neo.fill_strip(r, g, b)
+        self.neo.update_strip()
+        self._last_rgb = rgb
+    
+    def _stop_animation_thread(self):
+        """Stop the running animation, if there is one, and wait for it to finish"""
+        thread = self.animation_thread
+        if thread is None or not thread.is_alive():
+            return
+        self.stop_animation.set()
+        thread.join(timeout=1.0)
+        self.stop_animation.clear()
+    
     def set_color(self, r, g, b):
         """Set the LED strip to a specific color"""
         if not self.is_available or not self.neo:
             return False
             
         try:
-            # Make sure all values are integers
-            r = int(r)
-            g = int(g)
-            b = int(b)
-            
-            # Ensure values are in valid range (0-255)
-            r = max(0, min(255, r))
-            g = max(0, min(255, g))
-            b = max(0, min(255, b))
+            # Make sure all values are integers in valid range (0-255)
+            r, g, b = _clamp(r), _clamp(g), _clamp(b)
             
             # Stop any ongoing animations
-            self.stop_animation.set()
-            if self.animation_thread and self.animation_thread.is_alive():
-                self.animation_thread.join(timeout=1.0)
-            self.stop_animation.clear()
+            self._stop_animation_thread()
             
             # Set the color
-            self.neo.fill_strip(r, g, b)
-            self.neo.update_strip()
+            self._send_color(r, g, b)
             
             return True
             
         except Exception as e:
-            print(f"[LED] Error controlling LEDs: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("[LED] Error controlling LEDs: %s", e, extra=RATE_LIMITED)
             return False
     
     def _animation_thread_function(self, animation_type, duration, **kwargs):
         """Thread function for LED animations"""
-        start_time = time.time()
+        start_time = time.monotonic()
         end_time = start_time + duration if duration > 0 else float('inf')
         
         try:
@@ -121,73 +156,85 @@ class LedController:
                 color_b = kwargs.get('b', 255)
                 interval = kwargs.get('interval', 0.5)
                 
-                while time.time() < end_time and not self.stop_animation.is_set():
+                # Waiting on the stop event returns as soon as a stop is requested
+                while time.monotonic() < end_time:
                     # On
-                    self.neo.fill_strip(color_r, color_g, color_b)
-                    self.neo.update_strip()
-                    time.sleep(interval)
-                    
-                    # Check if stop was requested during the sleep
-                    if self.stop_animation.is_set():
+                    self._send_color(color_r, color_g, color_b)
+                    if self.stop_animation.wait(interval):
                         break
                     
                     # Off
-                    self.neo.fill_strip(0, 0, 0)
-                    self.neo.update_strip()
-                    time.sleep(interval)
-                    
-                    # Check if stop was requested during the sleep
-                    if self.stop_animation.is_set():
+                    self._send_color(0, 0, 0)
+                    if self.stop_animation.wait(interval):
                         break
                         
             elif animation_type == "pulse":
-                color_r = kwargs.get('r', 255)
-                color_g = kwargs.get('g', 255)
-                color_b = kwargs.get('b', 255)
+                color_r = int(kwargs.get('r', 255))
+                color_g = int(kwargs.get('g', 255))
+                color_b = int(kwargs.get('b', 255))
                 cycle_time = kwargs.get('cycle_time', 2.0)
                 
-                while time.time() < end_time and not self.stop_animation.is_set():
-                    # Calculate the brightness based on a sine wave
-                    elapsed = (time.time() - start_time) % cycle_time
-                    phase = elapsed / cycle_time
-                    brightness = int(128 + 127 * math.sin(2 * math.pi * phase))
-                    
-                    # Scale the RGB values by the brightness
-                    scaled_r = int(color_r * brightness / 255)
-                    scaled_g = int(color_g * brightness / 255)
-                    scaled_b = int(color_b * brightness / 255)
-                    
-                    self.neo.fill_strip(scaled_r, scaled_g, scaled_b)
-                    self.neo.update_strip()
-                    time.sleep(0.05)  # Small sleep to not overwhelm the SPI bus
-                    
-                    # Check if stop was requested during the sleep
-                    if self.stop_animation.is_set():
+                # The whole cycle is computed up front, leaving only the strip
+                # writes and the waits in the loop
+                frame_time = 0.05
+                frames = self._build_pulse_frames(color_r, color_g, color_b, cycle_time, frame_time)
+                
+                for r, g, b in cycle(frames):
+                    if time.monotonic() >= end_time:
+                        break
+                    self._send_color(r, g, b)
+                    # Small wait to not overwhelm the SPI bus
+                    if self.stop_animation.wait(frame_time):
                         break
                         
             elif animation_type == "rainbow":
-                while time.time() < end_time and not self.stop_animation.is_set():
-                    for i in range(256):
-                        if self.stop_animation.is_set():
+                frames = LedController._rainbow_frames
+                if frames is None:
+                    frames = LedController._rainbow_frames = self._build_rainbow_frames()
+                    
+                while time.monotonic() < end_time and not self.stop_animation.is_set():
+                    for r, g, b in frames:
+                        self._send_color(r, g, b)
+                        if self.stop_animation.wait(0.05):
                             break
-                            
-                        # Create rainbow effect
-                        r = int(128 + 127 * math.sin(i * 0.024))
-                        g = int(128 + 127 * math.sin((i * 0.024) + 2.1))
-                        b = int(128 + 127 * math.sin((i * 0.024) + 4.2))
-                        
-                        self.neo.fill_strip(r, g, b)
-                        self.neo.update_strip()
-                        time.sleep(0.05)
                         
         except Exception as e:
-            print(f"[LED] Error in animation thread: {e}")
+            log.exception("[LED] Error in animation thread: %s", e, extra=RATE_LIMITED)
             
         finally:
             # Make sure LEDs are off when animation is done
             if not self.stop_animation.is_set():  # Only if not stopped externally
-                self.neo.fill_strip(0, 0, 0)
-                self.neo.update_strip()
+                self._send_color(0, 0, 0)
+    
+    @staticmethod
+    def _build_pulse_frames(color_r, color_g, color_b, cycle_time, frame_time):
+        """The colors of one pulse cycle, one per frame_time"""
+        count = max(1, round(cycle_time / frame_time))
+        # The phase advances by a fixed number of sine table entries per frame
+        step = _SIN_LUT_SIZE / count
+        frames = []
+        for i in range(count):
+            brightness = _SIN_LUT[int(i * step) & _SIN_LUT_MASK]
+            # Scale the RGB values by the brightness (/ 256, at most 1 below / 255)
+            frames.append((
+                (color_r * brightness) >> 8,
+                (color_g * brightness) >> 8,
+                (color_b * brightness) >> 8,
+            ))
+        return tuple(frames)
+    
+    @staticmethod
+    def _build_rainbow_frames():
+        """The 256 colors of one rainbow cycle"""
+        frames = []
+        for i in range(256):
+            k = int(i * _RAINBOW_STEP)
+            frames.append((
+                _SIN_LUT[k & _SIN_LUT_MASK],
+                _SIN_LUT[(k + _RAINBOW_OFF_G) & _SIN_LUT_MASK],
+                _SIN_LUT[(k + _RAINBOW_OFF_B) & _SIN_LUT_MASK],
+            ))
+        return tuple(frames)
     
     def start_animation(self, animation_type, duration=0, **kwargs):
         """
@@ -208,14 +255,8 @@ class LedController:
             return False
             
         try:
-            # Import math for animations
-            import math
-            
             # Stop any ongoing animations
-            self.stop_animation.set()
-            if self.animation_thread and self.animation_thread.is_alive():
-                self.animation_thread.join(timeout=1.0)
-            self.stop_animation.clear()
+            self._stop_animation_thread()
             
             # Start the new animation
             self.animation_thread = threading.Thread(
@@ -229,7 +270,7 @@ class LedController:
             return True
             
         except Exception as e:
-            print(f"[LED] Error starting animation: {e}")
+            log.error("[LED] Error starting animation: %s", e, extra=RATE_LIMITED)
             return False
     
     def stop_all_animations(self):
@@ -238,22 +279,14 @@ class LedController:
             return False
             
         try:
-            # Signal the animation thread to stop
-            self.stop_animation.set()
-            
-            # Wait for the thread to finish
-            if self.animation_thread and self.animation_thread.is_alive():
-                self.animation_thread.join(timeout=1.0)
-            
-            # Reset the flag
-            self.stop_animation.clear()
+            # Stop the animation thread if one is running
+            self._stop_animation_thread()
             
             # Turn off all LEDs
-            self.neo.fill_strip(0, 0, 0)
-            self.neo.update_strip()
+            self._send_color(0, 0, 0)
             
             return True
             
         except Exception as e:
-            print(f"[LED] Error stopping animations: {e}")
+            log.error("[LED] Error stopping animations: %s", e, extra=RATE_LIMITED)
             return False
\ No newline at end of file
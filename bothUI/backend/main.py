@@ -7,10 +7,41 @@ Initializes all components and starts the main event loop
 """
 
 import asyncio
-import time
 import signal
 import sys
+import logging
 import threading
+import time
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from utils import SuppressedCountFormatter
+
+# Modules log with the same [Component] prefixes they print with, so keep the
+# output plain; configured before the imports so their startup messages show.
+# Records are handed to a background thread so writing to stdout never blocks
+# the event loop.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(SuppressedCountFormatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+log_listener = QueueListener(_log_queue, _log_handler)
+log_listener.start()
+log = logging.getLogger("main")
+
+# uvloop's event loop moves aiortc's packet handling out of Python-level callbacks
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# uringcore drives the loop with io_uring instead of epoll, preferred on Linux when installed
+try:
+    import uringcore
+    URINGCORE_AVAILABLE = sys.platform.startswith("linux") and hasattr(uringcore, "EventLoopPolicy")
+except ImportError:
+    URINGCORE_AVAILABLE = False
 
 # Import our modules
 from communication import CommunicationManager
@@ -18,38 +49,90 @@ from drone_control import DroneController
 from camera_manager import CameraManager
 from led_controller import LedController
 
-# Global shutdown flag
-shutdown_requested = False
-location_thread_active = False
+# Longest wait for each component's cleanup at shutdown, in seconds
+CLEANUP_TIMEOUT = 10.0
+
+# Set on the event loop when shutdown is requested, created by main()
+shutdown_event = None
+main_loop = None
 
 def signal_handler(sig, frame):
     """Handle CTRL+C and other termination signals"""
-    global shutdown_requested, location_thread_active
     print("[Main] Shutdown signal received, cleaning up...")
-    shutdown_requested = True
-    location_thread_active = False
+    if main_loop is not None:
+        main_loop.call_soon_threadsafe(shutdown_event.set)
+
+def _settle(future, result, error):
+    """Complete a future from run_in_daemon_thread unless wait_for already gave up on it"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
 
-def location_reporting_loop(drone_controller):
-    """Thread function that reports the drone location every 5 seconds"""
-    global location_thread_active
-    location_thread_active = True
+def run_in_daemon_thread(func, *args):
+    """
+    Run a blocking call on a daemon thread and return a future for its result.
     
-    print("[Main] Location reporting thread started")
+    Unlike the default executor, whose threads asyncio.run() joins on the way
+    out, a call that hangs here can't hold up exit past CLEANUP_TIMEOUT.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
     
-    while location_thread_active:
+    def run():
+        result = error = None
+        try:
+            result = func(*args)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(_settle, future, result, error)
+        except RuntimeError:
+            # The loop closed while we were stuck
+            pass
+    
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def boot_flash(led_controller):
+    """Blink the LEDs white briefly to indicate startup"""
+    led_controller.set_color(255, 255, 255)  # White
+    time.sleep(0.5)
+    led_controller.set_color(0, 0, 0)  # Off
+
+async def location_reporting_loop(drone_controller, shutdown_event):
+    """Task that reports the drone location every 5 seconds until shutdown"""
+    log.info("[Main] Location reporting started")
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    
+    while not shutdown_event.is_set():
         location = drone_controller.get_location()
-        if location:
-            print(f"[Drone] Current location: Lat {location['lat']:.6f}, Lon {location['lon']:.6f}, Alt {location['rel_alt']:.2f}m, Heading {location['heading']}°")
+        # DroneKit reports None for the position until there is a GPS fix
+        if location and None not in (location['lat'], location['lon'], location['rel_alt']):
+            log.info("[Drone] Current location: Lat %.6f, Lon %.6f, Alt %.2fm, Heading %s°",
+                     location['lat'], location['lon'], location['rel_alt'], location['heading'])
         else:
-            print("[Drone] Location not available")
+            log.info("[Drone] Location not available")
         
-        # Sleep for 5 seconds
-        time.sleep(5)
+        # Sleep until the next 5 second mark on the loop's monotonic clock, or
+        # less if shutdown is requested meanwhile
+        deadline += 5.0
+        try:
+            await asyncio.wait_for(shutdown_event.wait(), timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            pass
     
-    print("[Main] Location reporting thread stopped")
+    log.info("[Main] Location reporting stopped")
 
 async def main():
-    location_thread = None
+    global shutdown_event, main_loop
+    location_task = flash = None
+    led_controller = camera_manager = drone_controller = comm_manager = None
+    shutdown_event = asyncio.Event()
+    main_loop = asyncio.get_running_loop()
     
     try:
         # Set up signal handling for graceful shutdown
@@ -60,11 +143,10 @@ async def main():
         
         # Initialize the LED controller
         led_controller = LedController()
-        # Blink LEDs briefly to indicate startup
+        # Blink LEDs briefly to indicate startup. The constructors below block
+        # the loop, so the flash runs on the executor while they initialize
         if led_controller.is_available:
-            led_controller.set_color(255, 255, 255)  # White
-            await asyncio.sleep(0.5)
-            led_controller.set_color(0, 0, 0)  # Off
+            flash = main_loop.run_in_executor(None, boot_flash, led_controller)
         
         # Initialize the camera manager
         camera_manager = CameraManager()
@@ -72,10 +154,8 @@ async def main():
         # Initialize the drone controller
         drone_controller = DroneController(led_controller)
         
-        # Start location reporting thread
-        location_thread = threading.Thread(target=location_reporting_loop, args=(drone_controller,))
-        location_thread.daemon = True  # Thread will exit when main program exits
-        location_thread.start()
+        # Start location reporting
+        location_task = asyncio.create_task(location_reporting_loop(drone_controller, shutdown_event))
         
         # Initialize the communication manager with references to other components
         comm_manager = CommunicationManager(
@@ -84,12 +164,15 @@ async def main():
             led_controller=led_controller
         )
         
+        # Let the flash finish before remote commands can drive the LEDs
+        if flash is not None:
+            await flash
+        
         # Connect to the signaling server
         await comm_manager.connect_to_server("http://172.20.10.3:4000")
         
-        # Main loop to keep the program running
-        while not shutdown_requested:
-            await asyncio.sleep(1)
+        # Keep running until a signal asks us to stop
+        await shutdown_event.wait()
             
     except Exception as e:
         print(f"[Main] Error in main loop: {e}")
@@ -99,35 +182,44 @@ async def main():
     finally:
         print("[Main] Cleaning up resources...")
         
-        # Stop the location reporting thread
-        global location_thread_active
-        location_thread_active = False
-        
-        if location_thread and location_thread.is_alive():
-            location_thread.join(timeout=2.0)  # Wait for the thread to terminate
-        
-        # Clean up all components
-        try:
-            await comm_manager.disconnect()
-        except Exception as e:
-            print(f"[Main] Error during communication cleanup: {e}")
-        
-        try:
-            drone_controller.cleanup()
-        except Exception as e:
-            print(f"[Main] Error during drone controller cleanup: {e}")
-        
-        try:
-            camera_manager.cleanup()
-        except Exception as e:
-            print(f"[Main] Error during camera cleanup: {e}")
-        
-        try:
-            led_controller.set_color(0, 0, 0)  # Turn off LEDs
-        except Exception as e:
-            print(f"[Main] Error turning off LEDs: {e}")
+        # Stop the location reporting
+        shutdown_event.set()
+        if location_task is not None:
+            try:
+                await asyncio.wait_for(location_task, timeout=2.0)
+            except Exception as e:
+                print(f"[Main] Error stopping location reporting: {e}")
+        
+        # Clean up all components at once, the blocking ones on daemon threads
+        cleanups = []
+        if comm_manager is not None:
+            cleanups.append(("communication", comm_manager.disconnect()))
+        if drone_controller is not None:
+            cleanups.append(("drone controller", run_in_daemon_thread(drone_controller.cleanup)))
+        if camera_manager is not None:
+            cleanups.append(("camera", run_in_daemon_thread(camera_manager.cleanup)))
+        if led_controller is not None:
+            # Turn off LEDs
+            cleanups.append(("LED", run_in_daemon_thread(led_controller.set_color, 0, 0, 0)))
+        
+        results = await asyncio.gather(
+            *(asyncio.wait_for(step, timeout=CLEANUP_TIMEOUT) for _, step in cleanups),
+            return_exceptions=True
+        )
+        for (name, _), result in zip(cleanups, results):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"[Main] {name.capitalize()} cleanup timed out")
+            elif isinstance(result, BaseException):
+                print(f"[Main] Error during {name} cleanup: {result}")
         
         print("[Main] Shutdown complete")
+        log_listener.stop()
 
 if __name__ == "__main__":
+    if URINGCORE_AVAILABLE:
+        asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+        print("[Main] Using uringcore event loop")
+    elif UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        print("[Main] Using uvloop event loop")
     asyncio.run(main())
\ No newline at end of file
@@ -5,6 +5,7 @@ import io
 import os
 import threading
 import queue
+from collections import deque
 
 def is_raspberrypi():
     """Check if the code is running on a Raspberry Pi."""
@@ -14,6 +15,28 @@ def is_raspberrypi():
     except Exception: pass
     return False
 
+# Status frames for fixed messages, rendered once and keyed by (message, height, width)
+_STATUS_FRAMES = {}
+
+def _status_frame(message, height, width, color):
+    """Return a read-only black frame with a fixed message, rendering it only once."""
+    key = (message, height, width)
+    frame = _STATUS_FRAMES.get(key)
+    if frame is None:
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.putText(
+            frame, 
+            message, 
+            (50, height // 2),
+            cv2.FONT_HERSHEY_SIMPLEX, 
+            1, 
+            color, 
+            2
+        )
+        frame.setflags(write=False)
+        _STATUS_FRAMES[key] = frame
+    return frame
+
 class ThermalCamera:
     def __init__(self, device_path='/dev/andrei'):
         """Initialize the thermal camera with specified device path."""
@@ -38,9 +61,19 @@ class ThermalCamera:
         
         # Frame processing resources
         self.frame_queue = queue.Queue(maxsize=10)
-        self.display_queue = queue.Queue(maxsize=10)
         self.stop_event = threading.Event()
         
+        # Latest processed frame, shared by all consumers without being consumed
+        self._frame_lock = threading.Lock()
+        self.last_processed_frame = None
+        # Recent frames with their capture time (monotonic ns), for pairing with
+        # the regular camera; see get_frame_near()
+        self.frame_history = deque(maxlen=8)
+        
+        # Whether the capture device is open; kept current so consumers don't
+        # need to query the driver on every frame
+        self.available = False
+        
         # Camera initialization
         self.initialize_camera()
         
@@ -73,6 +106,11 @@ class ThermalCamera:
             
             # Configure camera settings
             if self.cap.isOpened():
+                # Keep only the newest frame queued in V4L2 to avoid latency
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                # Request the sensor's native YUYV format so no conversion happens
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'YUYV'))
+                
                 if self.is_pi:
                     self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0.0)
                 else:
@@ -81,12 +119,15 @@ class ThermalCamera:
                 # Don't change camera resolution - thermal camera has a specific format
                 
                 print(f"Thermal camera initialized successfully with device {self.device_path}")
+                self.available = True
                 return True
             else:
                 print(f"Failed to open thermal camera at {self.device_path}")
+                self.available = False
                 return False
         except Exception as e:
             print(f"Error initializing thermal camera: {e}")
+            self.available = False
             return False
         
     def setup_threads(self):
@@ -115,6 +156,7 @@ class ThermalCamera:
         try:
             while not self.stop_event.is_set():
                 if not self.cap.isOpened():
+                    self.available = False
                     if reconnect_attempts < max_reconnect_attempts:
                         print(f"Camera disconnected, attempting to reconnect... ({reconnect_attempts+1}/{max_reconnect_attempts})")
                         reconnect_attempts += 1
@@ -138,6 +180,10 @@ class ThermalCamera:
                 # If we got this far, we have an open camera
                 reconnect_attempts = 0  # Reset counter on successful reads
                     
+                # Every frame is read and decoded: the live stream, the thermal
+                # video and the .npy export all share them. The export takes
+                # its thermal_data_fps samples from acquire_latest_raw() instead
+                # of skipping frames here, which would starve the other two
                 ret, frame = self.cap.read()
                 
                 if not ret:
@@ -147,7 +193,7 @@ class ThermalCamera:
                     
                 try:
                     # Put frame in queue with timeout to allow checking stop event
-                    self.frame_queue.put(frame, timeout=1)
+                    self.frame_queue.put((time.monotonic_ns(), frame), timeout=1)
                 except queue.Full:
                     # If queue is full, skip this frame
                     pass
@@ -169,24 +215,18 @@ class ThermalCamera:
             while not self.stop_event.is_set():
                 try:
                     # Get frame with timeout
-                    frame = self.frame_queue.get(timeout=1)
+                    item = self.frame_queue.get(timeout=1)
                     
-                    if frame is None:  # Termination signal
+                    if item is None:  # Termination signal
                         break
+                    captured_ns, frame = item
                         
                     # Process the frame
                     try:
                         processed_frame, temp_data = self.process_frame(frame)
                         
-                        # Save last successful processed frame for backup
-                        self.last_processed_frame = (processed_frame, temp_data)
-                        
-                        try:
-                            # Put processed frame in display queue
-                            self.display_queue.put((processed_frame, temp_data), timeout=1)
-                        except queue.Full:
-                            # If display queue is full, skip this frame
-                            pass
+                        # Publish the frame to every consumer
+                        self._publish_frame(processed_frame, temp_data, captured_ns)
                     except Exception as frame_err:
                         # Only print the first few errors or if it's a new type of error
                         if not hasattr(self, '_error_types'):
@@ -211,12 +251,7 @@ class ThermalCamera:
                         )
                         
                         error_data = {"error": str(frame_err)}
-                        
-                        try:
-                            # Put error frame in display queue
-                            self.display_queue.put((error_frame, error_data), timeout=1)
-                        except queue.Full:
-                            pass
+                        self._publish_frame(error_frame, error_data)
                         
                 except queue.Empty:
                     # If no frame is available, just continue
@@ -225,6 +260,24 @@ class ThermalCamera:
         except Exception as e:
             print(f"Error in thermal frame processing thread: {e}")
     
+    def _publish_frame(self, processed_frame, temp_data, captured_ns=None):
+        """Replace the shared latest frame; consumers only ever see complete frames."""
+        with self._frame_lock:
+            self.last_processed_frame = (processed_frame, temp_data)
+            # Error frames have no capture time and stay out of the history
+            if captured_ns is not None:
+                self.frame_history.append((captured_ns, processed_frame, temp_data))
+    
+    def get_frame_near(self, timestamp_ns):
+        """
+        Return (captured_ns, processed_frame, temp_data) of the recent frame
+        captured closest to timestamp_ns (time.monotonic_ns()), or None.
+        """
+        with self._frame_lock:
+            if not self.frame_history:
+                return None
+            return min(self.frame_history, key=lambda entry: abs(entry[0] - timestamp_ns))
+    
     def process_frame(self, frame):
         """Process a single thermal frame and return the processed frame and temperature data."""
         try:
@@ -258,8 +311,11 @@ class ThermalCamera:
                     # Use exact formula from thermal.py - don't assume channel structure
                     raw_temps = (thdata_uint16[...,0] + thdata_uint16[...,1] * 256) / 64 - 273.15
                     
-                    # Store raw temperatures for bounding box detection
-                    self._raw_temps = raw_temps.copy()
+                    # Store raw temperatures for bounding box detection. The array is
+                    # freshly computed for every frame and never modified afterwards,
+                    # so readers can hold on to it without copying.
+                    raw_temps.setflags(write=False)
+                    self._raw_temps = raw_temps
                     
                     # Store basic statistics about the temperature data
                     self._raw_temps_stats = {
@@ -449,16 +505,7 @@ class ThermalCamera:
                 print(f"Error processing thermal frame: {e}")
                 self._process_error_count += 1
             # Return a black image with error message if processing fails
-            blank = np.zeros((self.new_height, self.new_width, 3), dtype=np.uint8)
-            cv2.putText(
-                blank, 
-                "Thermal camera error", 
-                (50, self.new_height // 2),
-                cv2.FONT_HERSHEY_SIMPLEX, 
-                1, 
-                (0, 0, 255), 
-                2
-            )
+            blank = _status_frame("Thermal camera error", self.new_height, self.new_width, (0, 0, 255))
             return blank, {'error': str(e)}
     
     def _rotate_image_and_points(self, image, angle, points, center=None, scale=1.0):
@@ -720,35 +767,33 @@ class ThermalCamera:
                     print(f"Error drawing temperature bounding boxes: {e}")
                     self._bbox_errors += 1
     
+    def acquire_latest_raw(self):
+        """
+        Return the latest raw temperature array, or None if none is available yet.
+        
+        Each frame's array is published read-only and replaced rather than
+        modified, so callers can keep it without copying.
+        """
+        return getattr(self, '_raw_temps', None)
+    
     def get_latest_frame(self):
         """Return the latest processed thermal frame."""
         try:
             # First check if camera is still open
-            if not hasattr(self, 'cap') or not self.cap.isOpened():
+            if not self.available:
                 print("Thermal camera is not open in get_latest_frame")
                 return None
                 
-            # Try to get a frame with a short timeout
-            try:
-                frame_data = self.display_queue.get(block=True, timeout=0.1)
+            # Read the latest frame without consuming it, so the stream and the
+            # recorders all see the same frames
+            with self._frame_lock:
+                frame_data = self.last_processed_frame
+            if frame_data is not None:
                 return frame_data
-            except queue.Empty:
-                # Create a simple status frame if queue is empty
-                if hasattr(self, 'last_processed_frame') and self.last_processed_frame is not None:
-                    return self.last_processed_frame
-                else:
-                    # Create simple status frame
-                    status_frame = np.zeros((576, 768, 3), dtype=np.uint8)
-                    cv2.putText(
-                        status_frame, 
-                        "Waiting for thermal data...", 
-                        (50, 288),
-                        cv2.FONT_HERSHEY_SIMPLEX, 
-                        1, 
-                        (0, 200, 200), 
-                        2
-                    )
-                    return status_frame, {"status": "waiting"}
+                
+            # Simple status frame
+            status_frame = _status_frame("Waiting for thermal data...", 576, 768, (0, 200, 200))
+            return status_frame, {"status": "waiting"}
         except Exception as e:
             print(f"Error in get_latest_frame: {e}")
             return None
@@ -934,6 +979,7 @@ class ThermalCamera:
     def close(self):
         """Close the thermal camera and stop processing threads."""
         self.stop_event.set()
+        self.available = False
         
         if hasattr(self, 'cap') and self.cap.isOpened():
             self.cap.release()
@@ -7,7 +7,9 @@ Utility functions shared across the drone control system
 
 import io
 import os
+import glob
 import time
+import logging
 import random
 import string
 
@@ -75,27 +77,48 @@ def get_device_serial():
     # Return a random ID if we can't get the serial
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
-def get_available_video_devices():
+# Names of the V4L2 nodes created by the Raspberry Pi camera/ISP drivers
+PI_CAMERA_DEVICE_NAMES = ('unicam', 'bcm2835', 'rp1-cfe', 'pispbe', 'hevc')
+
+def _read_sysfs(path):
+    """Read a sysfs attribute, returning None if it can't be read"""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def get_available_video_devices(skip_names=()):
     """
-    Find available video devices on the system
+    Find available video devices on the system without opening them
+    
+    Args:
+        skip_names: Device name fragments to ignore (case-insensitive)
     
     Returns:
         list: List of available video device indices
     """
     available_devices = []
     
-    # Try to find video devices
-    for i in range(10):  # Try devices 0-9
+    for path in glob.glob('/dev/video*'):
         try:
-            import cv2
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                available_devices.append(i)
-                cap.release()
-        except Exception:
-            pass
+            index = int(path.rsplit('video', 1)[1])
+        except ValueError:
+            continue
+            
+        sysfs_dir = f'/sys/class/video4linux/video{index}'
+        
+        # Secondary nodes (e.g. UVC metadata) have a non-zero index
+        if _read_sysfs(os.path.join(sysfs_dir, 'index')) not in (None, '0'):
+            continue
+            
+        name = (_read_sysfs(os.path.join(sysfs_dir, 'name')) or '').lower()
+        if any(skip in name for skip in skip_names):
+            continue
+            
+        available_devices.append(index)
     
-    return available_devices
+    return sorted(available_devices)
 
 def clamp(value, min_value, max_value):
     """Clamp a value between minimum and maximum values"""
@@ -165,4 +188,48 @@ def calculate_bearing(lat1, lon1, lat2, lon2):
     # Normalize to 0-360
     bearing_deg = (bearing_deg + 360) % 360
     
-    return bearing_deg
\ No newline at end of file
+    return bearing_deg
+
+# Pass as extra= to a log call on a hot path to have RateLimitFilter limit it
+RATE_LIMITED = {"rate_limited": True}
+
+class RateLimitFilter(logging.Filter):
+    """
+    Logging filter that lets each rate-limited message through at most once per interval.
+    
+    Only records logged with extra=RATE_LIMITED are limited, so one-off
+    messages that share a template (one per device probed, say) all show.
+    Messages are keyed by logger name and unformatted message, so log with
+    %-style arguments rather than f-strings for repeats to be recognised.
+    The next message that gets through carries the number dropped in its
+    suppressed attribute, see SuppressedCountFormatter.
+    """
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._last_emit = {}
+        self._suppressed = {}
+        
+    def filter(self, record):
+        if not getattr(record, "rate_limited", False):
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        last = self._last_emit.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+        self._last_emit[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class SuppressedCountFormatter(logging.Formatter):
+    """Formatter that notes how many copies of a message RateLimitFilter dropped"""
+    def formatMessage(self, record):
+        text = super().formatMessage(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text = f"{text} ({suppressed} similar messages suppressed)"
+        return text
\ No newline at end of file
@@ -549,8 +549,8 @@ useEffect(() => {
     if (peerRef.current && !activeListenersRef.current.dataListener) {
       console.log("[Admin] Setting up initial data listener");
       
-      const handleDataMessage = (data) => {
-        const msg = data.toString();
+      // The drone batches messages into one send, separated by newlines
+      const handleMessage = (msg) => {
         console.log("[Admin] Received message:", msg);
         
         // Handle all message types here
@@ -600,6 +600,12 @@ useEffect(() => {
         }
       };
       
+      const handleDataMessage = (data) => {
+        // Anything from the drone shows the link is alive, not just heartbeats
+        setLastHeartbeatTime(Date.now());
+        data.toString().split("\n").forEach(handleMessage);
+      };
+      
       peerRef.current.on('data', handleDataMessage);
       activeListenersRef.current.dataListener = handleDataMessage;
     }
@@ -982,10 +988,14 @@ useEffect(() => {
     }
   };
 
+  // The drone batches messages into one send, separated by newlines
   const handleDataMessage = (data) => {
-    const msg = data.toString();
-    handleLocationMessage(msg);
-    handleOtherMessages(msg);
+    // Anything from the drone shows the link is alive, not just heartbeats
+    setLastHeartbeatTime(Date.now());
+    data.toString().split("\n").forEach((msg) => {
+      handleLocationMessage(msg);
+      handleOtherMessages(msg);
+    });
   };
 
   // Set up data listener on the peer connection
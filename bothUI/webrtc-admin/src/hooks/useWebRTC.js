@@ -55,6 +55,21 @@ export const useWebRTC = () => {
       
       peerRef.current = peer;
       
+      // The drone opens a reliable "chat" channel for commands and an
+      // unordered, lossy "ctrl" channel for telemetry. simple-peer sends on
+      // whichever channel was announced last, so pin sends to "chat" by label
+      peer._pc.addEventListener("datachannel", (event) => {
+        const channel = event.channel;
+        if (channel.label !== "chat") return;
+        peer.send = (data) => {
+          if (channel.readyState !== "open") {
+            console.warn("[Admin] Command channel not open, dropping:", data);
+            return;
+          }
+          channel.send(data);
+        };
+      });
+      
       peer.on("signal", (signalData) => {
         if (signalData.type === "answer") {
           console.log("[Admin] Sending answer via socket...");